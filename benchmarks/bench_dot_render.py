@@ -0,0 +1,104 @@
+import argparse
+import shlex
+import shutil
+import time
+
+from ontol import DotGenerator, Ontology, Parser, PlantUML
+from ontol.renderers import DotRenderer, LocalRenderer, PipeRenderer, Renderer
+
+
+def generate_ontologies(count: int, types: int) -> list[Ontology]:
+    # One small ontology per diagram, like the figures of a file
+    ontologies: list[Ontology] = []
+    for i in range(count):
+        lines: list[str] = ['types:']
+        lines += [f"t{j}: 'Type {j}', 'Diagram {i}'" for j in range(types)]
+        lines += ['', 'hierarchy:']
+        lines += [f't0 aggregation t{j}' for j in range(1, types)]
+        ontology, _ = Parser().parse('\n'.join(lines) + '\n', 'bench.ontol')
+        ontologies.append(ontology)
+    return ontologies
+
+
+def measure(
+    generator: PlantUML | DotGenerator,
+    renderer: Renderer,
+    ontologies: list[Ontology],
+    batch: bool,
+) -> float:
+    # End to end: generating the text and rendering it to PNG
+    start: float = time.perf_counter()
+    try:
+        if batch:
+            renderer.render_batch(
+                [generator.generate(ontology) for ontology in ontologies]
+            )
+        else:
+            for ontology in ontologies:
+                renderer.render(generator.generate(ontology))
+    finally:
+        renderer.close()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(
+        description='Render diagrams end to end through PlantUML and directly through Graphviz dot.'
+    )
+    args_parser.add_argument(
+        '--plantuml',
+        type=str,
+        default='plantuml',
+        help='PlantUML command line (e.g. "java -jar plantuml.jar")',
+    )
+    args_parser.add_argument(
+        '--dot', type=str, default='dot', help='Graphviz dot command line'
+    )
+    args_parser.add_argument(
+        '--diagrams', type=int, default=20, help='Number of diagrams'
+    )
+    args_parser.add_argument('--types', type=int, default=10, help='Types per diagram')
+    args = args_parser.parse_args()
+
+    plantuml_command: list[str] = shlex.split(args.plantuml)
+    dot_command: list[str] = shlex.split(args.dot)
+    ontologies: list[Ontology] = generate_ontologies(args.diagrams, args.types)
+
+    print(f'{"backend":>16} {"diagrams":>9} {"seconds":>9} {"ms/diagram":>11}')
+    for name, command, generator, renderer, batch in (
+        (
+            'plantuml',
+            plantuml_command,
+            PlantUML(),
+            LocalRenderer(plantuml_command),
+            False,
+        ),
+        (
+            'plantuml batch',
+            plantuml_command,
+            PlantUML(),
+            LocalRenderer(plantuml_command),
+            True,
+        ),
+        (
+            'plantuml pipe',
+            plantuml_command,
+            PlantUML(),
+            PipeRenderer(plantuml_command),
+            True,
+        ),
+        ('dot', dot_command, DotGenerator(), DotRenderer(dot_command), False),
+        ('dot batch', dot_command, DotGenerator(), DotRenderer(dot_command), True),
+    ):
+        if shutil.which(command[0]) is None:
+            print(f'{name:>16} skipped: {command[0]} not found')
+            continue
+        elapsed: float = measure(generator, renderer, ontologies, batch)
+        print(
+            f'{name:>16} {len(ontologies):>9} {elapsed:>9.3f} '
+            f'{elapsed / len(ontologies) * 1000:>11.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import time
+
+from bench_parse_scaling import generate_ontology
+from ontol import Parser
+from ontol.parser import Lexer, RegexLexer
+
+
+def generate_long_lists(size: int) -> str:
+    # Few definitions with very long parameter and attribute lists and one big
+    # figure, where list building dominates
+    lines: list[str] = ['types:', "term: 'Term', ''"]
+    lines.append(
+        "wide: 'Wide', '', {"
+        + ', '.join(f"color: '#{i % 0xFFFFFF:06X}'" for i in range(size))
+        + '}'
+    )
+    lines += ['', 'functions:']
+    params: str = ', '.join("term: 'arg'" for _ in range(size))
+    lines.append(f"func: 'Function' ({params}) -> term: 'out'")
+    lines += ['', "figure 'Figure':", *('term' for _ in range(size))]
+    return '\n'.join(lines) + '\n'
+
+
+def measure(parser: Parser, content: str, repeat: int) -> float:
+    best: float = float('inf')
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        parser.parse(content, 'benchmark.ontol')
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(
+        description='Compare the LALR and the recursive-descent parser engines.'
+    )
+    args_parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[10_000, 100_000],
+        help='Numbers of definitions / list items in the generated files',
+    )
+    args_parser.add_argument('--repeat', type=int, default=3, help='Runs per engine')
+    args = args_parser.parse_args()
+
+    configurations: list[tuple[str, Parser]] = [
+        ('lalr', Parser(Lexer, 'lalr')),
+        ('descent', Parser(Lexer, 'descent')),
+        ('lalr+regex', Parser(RegexLexer, 'lalr')),
+        ('descent+regex', Parser(RegexLexer, 'descent')),
+    ]
+
+    print(f'{"file":>12} {"size":>8} {"engine":>14} {"seconds":>9}')
+    for size in args.sizes:
+        for file_name, content in (
+            ('definitions', generate_ontology(size)),
+            ('long lists', generate_long_lists(size)),
+        ):
+            for name, parser in configurations:
+                elapsed: float = measure(parser, content, args.repeat)
+                print(f'{file_name:>12} {size:>8} {name:>14} {elapsed:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
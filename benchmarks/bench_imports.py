@@ -0,0 +1,58 @@
+import argparse
+import os
+import tempfile
+import time
+
+from ontol import Parser
+
+
+def generate_import_tree(directory: str, files: int, types: int, fanout: int) -> str:
+    # File i imports files fanout * i + 1 ... fanout * i + fanout, so the
+    # files form a tree; every file declares its own types
+    for i in range(files):
+        lines: list[str] = [
+            f"import * from '{child}.ontol'"
+            for child in range(fanout * i + 1, min(fanout * i + fanout + 1, files))
+        ]
+        lines += ['', 'types:']
+        lines += [
+            f"n{i}_t{j}: 'Type {j}', 'Type {j} of file {i}'" for j in range(types)
+        ]
+        with open(os.path.join(directory, f'{i}.ontol'), 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+    return os.path.join(directory, '0.ontol')
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(
+        description='Parse a synthetic import tree serially and in worker processes.'
+    )
+    args_parser.add_argument('--files', type=int, default=500, help='Number of files')
+    args_parser.add_argument('--types', type=int, default=200, help='Types per file')
+    args_parser.add_argument('--fanout', type=int, default=4, help='Imports per file')
+    args_parser.add_argument(
+        '--jobs',
+        type=int,
+        nargs='+',
+        default=[1, os.cpu_count() or 1],
+        help='Worker process counts to compare',
+    )
+    args = args_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path: str = generate_import_tree(
+            directory, args.files, args.types, args.fanout
+        )
+        with open(file_path, encoding='utf-8') as file:
+            content: str = file.read()
+
+        print(f'{"jobs":>6} {"types":>8} {"seconds":>9}')
+        for jobs in args.jobs:
+            start: float = time.perf_counter()
+            ontology, _ = Parser(jobs=jobs).parse(content, file_path)
+            elapsed: float = time.perf_counter() - start
+            print(f'{jobs:>6} {len(ontology.types):>8} {elapsed:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
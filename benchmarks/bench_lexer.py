@@ -0,0 +1,45 @@
+import argparse
+import time
+
+from bench_parse_scaling import generate_ontology
+from ontol.parser import Lexer, RegexLexer
+
+
+def measure(lexer_class, content: str, repeat: int) -> tuple[float, int]:
+    best: float = float('inf')
+    tokens_count: int = 0
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        tokens_count = sum(1 for _ in lexer_class().tokenize(content))
+        best = min(best, time.perf_counter() - start)
+    return best, tokens_count
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(
+        description='Compare token throughput of the sly and the regex lexers.'
+    )
+    args_parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[10_000, 100_000],
+        help='Numbers of definitions in the generated files',
+    )
+    args_parser.add_argument('--repeat', type=int, default=3, help='Runs per lexer')
+    args = args_parser.parse_args()
+
+    print(f'{"definitions":>12} {"MB":>6} {"lexer":>6} {"MB/s":>8} {"Mtokens/s":>10}')
+    for size in args.sizes:
+        content: str = generate_ontology(size)
+        megabytes: float = len(content.encode('utf-8')) / 1e6
+        for name, lexer_class in (('sly', Lexer), ('regex', RegexLexer)):
+            elapsed, tokens_count = measure(lexer_class, content, args.repeat)
+            print(
+                f'{size:>12} {megabytes:>6.1f} {name:>6} '
+                f'{megabytes / elapsed:>8.2f} {tokens_count / elapsed / 1e6:>10.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import gc
+import tracemalloc
+
+from bench_parse_scaling import generate_ontology
+from ontol import Parser
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(
+        description='Measure the memory retained by parsed ontologies.'
+    )
+    args_parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[10_000, 100_000],
+        help='Numbers of definitions in the generated files',
+    )
+    args = args_parser.parse_args()
+
+    parser: Parser = Parser()
+    print(f'{"size":>8} {"retained MB":>12} {"bytes/definition":>17}')
+    for size in args.sizes:
+        content: str = generate_ontology(size)
+        gc.collect()
+        tracemalloc.start()
+        ontology, warnings = parser.parse(content, 'benchmark.ontol')
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        definitions: int = (
+            len(ontology.types) + len(ontology.functions) + len(ontology.hierarchy)
+        )
+        print(f'{size:>8} {retained / 2**20:>12.1f} {retained / definitions:>17.0f}')
+        del ontology, warnings
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import time
+
+from ontol import Parser
+
+
+def generate_ontology(size: int) -> str:
+    # Roughly half of the definitions are terms, the rest are split between
+    # functions and named relationships that reference them.
+    terms_count: int = max(size // 2, 2)
+    functions_count: int = size // 4
+    relationships_count: int = size - terms_count - functions_count
+
+    lines: list[str] = ["title: 'Scaling benchmark'", '', 'types:']
+    for i in range(terms_count):
+        lines.append(f"term{i}: 'Term {i}', 'Description {i}', {{color: '#D0FFD0'}}")
+
+    lines += ['', 'functions:']
+    for i in range(functions_count):
+        a, b = i % terms_count, (i * 7 + 1) % terms_count
+        lines.append(
+            f"func{i}: 'Function {i}' (term{a}: 'a', term{b}: 'b') -> term{i % terms_count}: 'out'"
+        )
+
+    lines += ['', 'hierarchy:']
+    for i in range(relationships_count):
+        parent, child = i % terms_count, (i + 1) % terms_count
+        lines.append(f'rel{i}: term{parent} composition term{child}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(
+        description='Measure how parse time scales with the number of definitions.'
+    )
+    args_parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[1_000, 10_000, 100_000],
+        help='Numbers of definitions to generate',
+    )
+    args = args_parser.parse_args()
+
+    parser: Parser = Parser()
+    print(f'{"definitions":>12} {"seconds":>10} {"us/definition":>14}')
+    for size in args.sizes:
+        content: str = generate_ontology(size)
+        start: float = time.perf_counter()
+        parser.parse(content, 'benchmark.ontol')
+        elapsed: float = time.perf_counter() - start
+        print(f'{size:>12} {elapsed:>10.3f} {elapsed / size * 1e6:>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import time
+import zlib
+
+from ontol.renderers import encode_plantuml
+
+
+def encode_by_groups(plantuml_text: str) -> str:
+    # The previous encoder: one Python call and one string append per 3 bytes
+    chars = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_'
+
+    def encode3bytes(b1, b2, b3):
+        c1 = b1 >> 2
+        c2 = ((b1 & 0x3) << 4) | (b2 >> 4)
+        c3 = ((b2 & 0xF) << 2) | (b3 >> 6)
+        c4 = b3 & 0x3F
+        return chars[c1] + chars[c2] + chars[c3] + chars[c4]
+
+    data = zlib.compress(plantuml_text.encode('utf-8'))[2:-4]
+    encoded_text = ''
+    for i in range(0, len(data), 3):
+        if i + 2 == len(data):
+            encoded_text += encode3bytes(data[i], data[i + 1], 0)
+        elif i + 1 == len(data):
+            encoded_text += encode3bytes(data[i], 0, 0)
+        else:
+            encoded_text += encode3bytes(data[i], data[i + 1], data[i + 2])
+    return encoded_text
+
+
+def generate_diagram(size: int) -> str:
+    lines: list[str] = ['@startuml']
+    length: int = 0
+    i: int = 0
+    while length < size:
+        lines.append(
+            f'rectangle "Type {i}\\n(Description of type {i})" as t{i} #D0FFD0'
+        )
+        if i:
+            lines.append(f't{i // 2} o-- t{i}')
+        length += len(lines[-1]) + len(lines[-2])
+        i += 1
+    lines.append('@enduml')
+    return '\n'.join(lines)
+
+
+def measure(encode, plantuml_text: str, repeat: int) -> float:
+    best: float = float('inf')
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        encode(plantuml_text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(
+        description='Encode diagrams for PlantUML server URLs with the per-group loop and the base64 translation.'
+    )
+    args_parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[1, 10, 100, 1000],
+        help='Diagram sizes in KB',
+    )
+    args_parser.add_argument('--repeat', type=int, default=5, help='Runs per size')
+    args = args_parser.parse_args()
+
+    print(f'{"KB":>6} {"groups ms":>10} {"level -1 ms":>12} {"level 9 ms":>11}')
+    for size in args.sizes:
+        plantuml_text: str = generate_diagram(size * 1024)
+        assert encode_plantuml(plantuml_text) == encode_by_groups(plantuml_text)
+        timings: list[float] = [
+            measure(encode, plantuml_text, args.repeat) * 1000
+            for encode in (
+                encode_by_groups,
+                encode_plantuml,
+                lambda text: encode_plantuml(text, 9),
+            )
+        ]
+        print(f'{size:>6} {timings[0]:>10.2f} {timings[1]:>12.2f} {timings[2]:>11.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import shlex
+import time
+
+from ontol import Parser, PlantUML
+from ontol.renderers import LocalRenderer, PipeRenderer, Renderer
+
+
+def generate_diagrams(count: int, types: int) -> list[str]:
+    # One small ontology per diagram, like the figures of a file
+    plantuml: PlantUML = PlantUML()
+    diagrams: list[str] = []
+    for i in range(count):
+        lines: list[str] = ['types:']
+        lines += [f"t{j}: 'Type {j}', 'Diagram {i}'" for j in range(types)]
+        lines += ['', 'hierarchy:']
+        lines += [f't0 aggregation t{j}' for j in range(1, types)]
+        ontology, _ = Parser().parse('\n'.join(lines) + '\n', 'bench.ontol')
+        diagrams.append(plantuml.generate(ontology))
+    return diagrams
+
+
+def measure(renderer: Renderer, diagrams: list[str], batch: bool) -> float:
+    start: float = time.perf_counter()
+    try:
+        if batch:
+            renderer.render_batch(diagrams)
+        else:
+            for diagram in diagrams:
+                renderer.render(diagram)
+    finally:
+        renderer.close()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(
+        description='Render diagrams with one PlantUML process per diagram, one process per batch and a long-lived -pipe process.'
+    )
+    args_parser.add_argument(
+        '--command',
+        type=str,
+        default='plantuml',
+        help='PlantUML command line (e.g. "java -jar plantuml.jar")',
+    )
+    args_parser.add_argument(
+        '--diagrams', type=int, default=20, help='Number of diagrams'
+    )
+    args_parser.add_argument('--types', type=int, default=10, help='Types per diagram')
+    args = args_parser.parse_args()
+
+    command: list[str] = shlex.split(args.command)
+    diagrams: list[str] = generate_diagrams(args.diagrams, args.types)
+
+    print(f'{"renderer":>10} {"diagrams":>9} {"seconds":>9} {"diagrams/s":>11}')
+    for name, renderer, batch in (
+        ('process', LocalRenderer(command), False),
+        ('batch', LocalRenderer(command), True),
+        ('pipe', PipeRenderer(command), True),
+    ):
+        elapsed: float = measure(renderer, diagrams, batch)
+        print(
+            f'{name:>10} {len(diagrams):>9} {elapsed:>9.3f} '
+            f'{len(diagrams) / elapsed:>11.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from bench_parse_scaling import generate_ontology
+from ontol import Parser
+
+
+def measure(content: str, file_path: str) -> tuple[float, int]:
+    # Time of an untraced parse and memory kept alive by the parser (including
+    # its import cache) in a traced one
+    start: float = time.perf_counter()
+    Parser().parse(content, file_path)
+    elapsed: float = time.perf_counter() - start
+
+    tracemalloc.start()
+    parser: Parser = Parser()
+    parser.parse(content, file_path)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, retained
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(
+        description='Compare selective and full imports of a large vocabulary.'
+    )
+    args_parser.add_argument(
+        '--size', type=int, default=100_000, help='Definitions in the vocabulary'
+    )
+    args = args_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        vocabulary_path: str = os.path.join(directory, 'vocabulary.ontol')
+        with open(vocabulary_path, 'w', encoding='utf-8') as file:
+            file.write(generate_ontology(args.size))
+        file_path: str = os.path.join(directory, 'main.ontol')
+
+        print(f'{"import":>12} {"seconds":>9} {"retained MB":>12}')
+        for name, content in (
+            ('*', "import * from 'vocabulary.ontol'\n"),
+            ('{ 3 names }', "import { term1, func2, rel3 } from 'vocabulary.ontol'\n"),
+        ):
+            elapsed, retained = measure(content, file_path)
+            print(f'{name:>12} {elapsed:>9.3f} {retained / 2**20:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
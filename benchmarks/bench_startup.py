@@ -0,0 +1,66 @@
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+IMPORT_TIME_PATTERN = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def measure_import(module: str, cache_dir: str) -> dict[str, tuple[int, int]]:
+    # Returns {module: (self us, cumulative us)} as reported by -X importtime
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env={**os.environ, 'ONTOL_CACHE_DIR': cache_dir},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return timings
+
+
+def main() -> None:
+    args_parser = argparse.ArgumentParser(
+        description='Measure import time of ontol with and without cached parser tables.'
+    )
+    args_parser.add_argument('--runs', type=int, default=10, help='Runs per mode')
+    args_parser.add_argument(
+        '--module', type=str, default='ontol.cli', help='Module to import'
+    )
+    args = args_parser.parse_args()
+
+    cache_dir: str = tempfile.mkdtemp(prefix='ontol-bench-')
+    results: dict[str, dict[str, list[int]]] = {}
+    try:
+        for mode in ('cold', 'cached'):
+            parser_times: list[int] = []
+            total_times: list[int] = []
+            for _ in range(args.runs):
+                if mode == 'cold':
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+                timings = measure_import(args.module, cache_dir)
+                parser_times.append(timings['ontol.parser'][0])
+                total_times.append(timings[args.module][1])
+            results[mode] = {'parser': parser_times, 'total': total_times}
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f'{"mode":>8} {"ontol.parser self, ms":>22} {args.module + " total, ms":>22}')
+    for mode, timings in results.items():
+        print(
+            f'{mode:>8} '
+            f'{statistics.median(timings["parser"]) / 1000:>22.2f} '
+            f'{statistics.median(timings["total"]) / 1000:>22.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
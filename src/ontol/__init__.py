@@ -13,14 +13,24 @@ from .oast import (
     RelationshipDirection,
     TermAttributes,
 )
+from .diagnostics import Diagnostic
 from .parser import Parser
-from .plantuml import PlantUML
+from .plantuml import PlantUML, DotGenerator
 from .serializer import JSONSerializer
 from .retranslator import Retranslator
-from .ai import AI
 from .cli import CLI
 
 
+def __getattr__(name: str):
+    # ai pulls in langchain, which takes most of the package import time, so
+    # it is only imported when AI is actually requested
+    if name == 'AI':
+        from .ai import AI
+
+        return AI
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
 __all__ = (
     'constants',
     'Ontology',
@@ -35,8 +45,10 @@ __all__ = (
     'Meta',
     'FunctionArgument',
     'RelationshipType',
+    'Diagnostic',
     'Parser',
     'PlantUML',
+    'DotGenerator',
     'JSONSerializer',
     'Retranslator',
     'AI',
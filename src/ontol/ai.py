@@ -188,10 +188,11 @@ class AI:
                 children: list[Term] = [child]
 
                 attributes: RelationshipAttributes = RelationshipAttributes(
-                    title=relationship.label
+                    title=relationship.label,
+                    direction=RelationshipDirection.BIDIRECTIONAL
+                    if relationship.is_bidirectional
+                    else None,
                 )
-                if relationship.is_bidirectional:
-                    attributes.direction = RelationshipDirection.BIDIRECTIONAL
 
                 rel = Relationship(
                     parent=parent,
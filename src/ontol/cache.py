@@ -0,0 +1,420 @@
+import functools
+import importlib.util
+import os
+import hashlib
+import marshal
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Callable, Optional
+
+import requests
+import sly
+
+from ontol import Ontology
+from ontol.diagnostics import Diagnostic
+from ontol.imports import SourceFetcher, get_content_hash
+
+
+def get_cache_dir() -> str:
+    cache_dir: Optional[str] = os.getenv('ONTOL_CACHE_DIR')
+    if cache_dir:
+        return cache_dir
+    cache_home: str = os.getenv('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache'
+    )
+    return os.path.join(cache_home, 'ontol')
+
+
+def load_pickle(file_path: str) -> Optional[Any]:
+    try:
+        with open(file_path, 'rb') as file:
+            return pickle.load(file)
+    except Exception:
+        # A missing, truncated or incompatible entry is treated as a miss
+        return None
+
+
+def dump_pickle(file_path: str, value: Any) -> bool:
+    return dump_bytes(file_path, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def dump_bytes(file_path: str, data: bytes) -> bool:
+    try:
+        directory: str = os.path.dirname(file_path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file first so that concurrent readers never see
+        # a partially written entry
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return True
+    except OSError:
+        return False
+
+
+def remove_file(file_path: str) -> None:
+    try:
+        os.unlink(file_path)
+    except FileNotFoundError:
+        pass
+
+
+# Modules whose code shapes cached ontologies and warnings
+PARSER_MODULES: tuple[str, ...] = (
+    'ontol.constants',
+    'ontol.descent',
+    'ontol.diagnostics',
+    'ontol.imports',
+    'ontol.interning',
+    'ontol.oast',
+    'ontol.parser',
+)
+
+
+def get_version() -> str:
+    try:
+        return version('ontol')
+    except PackageNotFoundError:
+        return 'dev'
+
+
+@functools.cache
+def get_code_hash() -> str:
+    # The package version does not change with edits to an editable install
+    # and is unknown in frozen builds, so cached ontologies are keyed by the
+    # code of the parser modules instead. Frozen builds have no sources, only
+    # their compiled code.
+    digest = hashlib.sha256()
+    for part in (get_version(), sly.__version__):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    for name in PARSER_MODULES:
+        spec = importlib.util.find_spec(name)
+        source: Optional[str] = spec.loader.get_source(name)
+        digest.update(
+            source.encode('utf-8')
+            if source is not None
+            else marshal.dumps(spec.loader.get_code(name))
+        )
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class DiskCache:
+    # Directory of pickled entries bounded by their total size. Entries are
+    # touched on every hit, so the least recently used ones are removed first
+    # once the directory grows past max_size. The total size is scanned once
+    # and then kept up to date by every store, and eviction goes down to
+    # low_water * max_size, so that a full scan only happens once in a while
+    # rather than on every store. Entries added by other processes are only
+    # counted by the next scan.
+    suffix: str = '.pickle'
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int = 64 * 1024 * 1024,
+        low_water: float = 0.9,
+    ) -> None:
+        self.directory: str = directory
+        self.max_size: int = max_size
+        self.low_water: float = low_water
+        self.size: Optional[int] = None
+        self.hits: int = 0
+        self.misses: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}{self.suffix}')
+
+    def get(
+        self, key: str, validate: Optional[Callable[[Any], bool]] = None
+    ) -> Optional[Any]:
+        file_path: str = self.get_path(key)
+        value: Optional[Any] = load_pickle(file_path)
+        if value is None or (validate is not None and not validate(value)):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        try:
+            os.utime(file_path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any) -> bool:
+        return self.put_bytes(
+            key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+
+    def put_bytes(self, key: str, data: bytes) -> bool:
+        file_path: str = self.get_path(key)
+        try:
+            replaced_size: int = os.stat(file_path).st_size
+        except OSError:
+            replaced_size = 0
+        if not dump_bytes(file_path, data):
+            return False
+
+        with self.lock:
+            scan: bool = self.size is None
+            if not scan:
+                self.size += len(data) - replaced_size
+        if scan:
+            # The first store counts the entries already on disk (and itself)
+            size: int = sum(size for _, size, _ in self._list_entries())
+            with self.lock:
+                self.size = size
+        if self.size > self.max_size:
+            self.evict()
+        return True
+
+    def evict(self) -> None:
+        entries: list[tuple[float, int, str]] = self._list_entries()
+        total_size: int = sum(size for _, size, _ in entries)
+        if total_size > self.max_size:
+            for _, size, file_path in sorted(entries):
+                if total_size <= self.max_size * self.low_water:
+                    break
+                if self._remove(file_path):
+                    total_size -= size
+        with self.lock:
+            self.size = total_size
+
+    def clear(self) -> None:
+        for _, _, file_path in self._list_entries():
+            self._remove(file_path)
+        with self.lock:
+            self.size = None
+
+    def _list_entries(self) -> list[tuple[float, int, str]]:
+        entries: list[tuple[float, int, str]] = []
+        try:
+            with os.scandir(self.directory) as iterator:
+                for entry in iterator:
+                    if entry.name.endswith(self.suffix):
+                        stat: os.stat_result = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            pass
+        return entries
+
+    @staticmethod
+    def _remove(file_path: str) -> bool:
+        try:
+            os.unlink(file_path)
+            return True
+        except OSError:
+            return False
+
+
+class OntologyCache(DiskCache):
+    # Parsed ontologies and their warnings keyed by the file path, content and
+    # parser code (see get_code_hash). Every entry also records the content hashes of the files
+    # it imports (transitively), and is only used while all of them match.
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_size: int = 64 * 1024 * 1024,
+        fetcher: Optional[SourceFetcher] = None,
+    ) -> None:
+        super().__init__(
+            directory or os.path.join(get_cache_dir(), 'ontologies'), max_size
+        )
+        self.fetcher: SourceFetcher = (
+            fetcher if fetcher is not None else SourceFetcher()
+        )
+
+    def get_key(self, file_content: str, file_path: str) -> str:
+        digest = hashlib.sha256()
+        for part in (get_code_hash(), os.path.realpath(file_path), file_content):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def load(
+        self, file_content: str, file_path: str
+    ) -> Optional[tuple[Ontology, list[Diagnostic], bool]]:
+        entry: Optional[dict[str, Any]] = self.get(
+            self.get_key(file_content, file_path), self._has_fresh_imports
+        )
+        if entry is None:
+            return None
+        return entry['ontology'], entry['warnings'], entry['default_date']
+
+    def store(
+        self,
+        file_content: str,
+        file_path: str,
+        ontology: Ontology,
+        warnings: list[Diagnostic],
+        imports: list[tuple[str, str]],
+        default_date: bool,
+    ) -> bool:
+        # Diagnostics are rendered before pickling so that the entry does not
+        # keep the whole source of the file
+        for warning in warnings:
+            str(warning)
+
+        return self.put(
+            self.get_key(file_content, file_path),
+            {
+                'ontology': ontology,
+                'warnings': warnings,
+                'imports': imports,
+                'default_date': default_date,
+            },
+        )
+
+    def _has_fresh_imports(self, entry: dict[str, Any]) -> bool:
+        # The imports are read concurrently, so remote ones cost one round trip
+        # in total rather than one each
+        contents: dict[str, str | Exception] = self.fetcher.fetch_all(
+            [source for source, _ in entry['imports']]
+        )
+        return all(
+            isinstance(contents[source], str)
+            and get_content_hash(contents[source]) == content_hash
+            for source, content_hash in entry['imports']
+        )
+
+
+class HTTPCache(DiskCache):
+    # Bodies of remote imports with their validators. Fresh entries (within
+    # Cache-Control max-age) are served without a request, stale ones are
+    # revalidated with If-None-Match/If-Modified-Since. In offline mode only
+    # cached bodies are served, whether fresh or not.
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_size: int = 64 * 1024 * 1024,
+        offline: bool = False,
+    ) -> None:
+        super().__init__(directory or os.path.join(get_cache_dir(), 'http'), max_size)
+        self.offline: bool = offline
+
+    def get_key(self, url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def fetch(self, session: requests.Session, url: str, timeout: float) -> str:
+        key: str = self.get_key(url)
+        entry: Optional[dict[str, Any]] = self.get(key)
+
+        if self.offline:
+            if entry is None:
+                raise requests.ConnectionError(
+                    f'{url} is not cached and offline mode is enabled'
+                )
+            return entry['body']
+
+        if entry is not None and entry['expires'] > time.time():
+            return entry['body']
+
+        headers: dict[str, str] = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response: requests.Response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry is not None:
+            entry['expires'] = self._get_expires(response)
+            self.put(key, entry)
+            return entry['body']
+
+        response.raise_for_status()
+        body: str = response.content.decode('utf-8')
+        cache_control: str = response.headers.get('Cache-Control', '').lower()
+        if 'no-store' not in cache_control:
+            self.put(
+                key,
+                {
+                    'body': body,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'expires': self._get_expires(response),
+                },
+            )
+        return body
+
+    @staticmethod
+    def _get_expires(response: requests.Response) -> float:
+        directives: list[str] = [
+            directive.strip()
+            for directive in response.headers.get('Cache-Control', '')
+            .lower()
+            .split(',')
+        ]
+        if 'no-cache' in directives:
+            return 0.0
+
+        for directive in directives:
+            name, _, value = directive.partition('=')
+            if name == 'max-age':
+                try:
+                    return time.time() + int(value.strip('"'))
+                except ValueError:
+                    return 0.0
+        return 0.0
+
+
+class RenderCache(DiskCache):
+    # Rendered images keyed by a hash of the PlantUML text, the renderer and
+    # the image format. Images are stored as plain files and hard-linked (or
+    # copied) to the output path instead of being rendered again.
+    suffix: str = '.png'
+
+    def __init__(
+        self, directory: Optional[str] = None, max_size: int = 64 * 1024 * 1024
+    ) -> None:
+        super().__init__(
+            directory or os.path.join(get_cache_dir(), 'renders'), max_size
+        )
+
+    def get_key(
+        self, plantuml_text: str, renderer: str, image_format: str = 'png'
+    ) -> str:
+        digest = hashlib.sha256()
+        for part in (renderer, image_format, plantuml_text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def link(self, key: str, file_path: str) -> bool:
+        cached_path: str = self.get_path(key)
+        try:
+            # The output may be a link to another entry, which must not be
+            # overwritten in place
+            remove_file(file_path)
+            try:
+                os.link(cached_path, file_path)
+            except OSError:
+                shutil.copyfile(cached_path, file_path)
+        except OSError:
+            with self.lock:
+                self.misses += 1
+            return False
+
+        with self.lock:
+            self.hits += 1
+        try:
+            os.utime(cached_path)
+        except OSError:
+            pass
+        return True
+
+    def store(self, key: str, image: bytes) -> bool:
+        return self.put_bytes(key, image)
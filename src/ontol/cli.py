@@ -1,7 +1,12 @@
+import io
 import os
 import re
+import sys
 import time
-from typing import Optional, List
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from itertools import repeat
+from typing import Optional, List, TYPE_CHECKING
 import glob
 
 from unidecode import unidecode
@@ -10,21 +15,50 @@ from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 from watchdog.observers.api import BaseObserver
 
-from argparse import ArgumentParser, Namespace
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
 
 from ontol import (
+    Diagnostic,
     Parser,
     JSONSerializer,
     PlantUML,
+    DotGenerator,
     Retranslator,
     Ontology,
     Figure,
-    AI,
     constants,
 )
+from ontol.cache import (
+    DiskCache,
+    HTTPCache,
+    OntologyCache,
+    RenderCache,
+    get_cache_dir,
+)
+from ontol.imports import SourceFetcher
+from ontol.renderers import get_renderer
+
+if TYPE_CHECKING:
+    from ontol.ai import AI
 
 __VERSION__ = os.getenv('ONTOL_VERSION', 'dev')
 
+EMIT_STAGES: frozenset[str] = frozenset({'json', 'puml', 'png'})
+
+
+def parse_emit(value: str) -> frozenset[str]:
+    stages: frozenset[str] = frozenset(
+        stage.strip() for stage in value.lower().split(',') if stage.strip()
+    )
+    if stages == {'none'}:
+        return frozenset()
+    unknown: frozenset[str] = stages - EMIT_STAGES
+    if unknown or not stages:
+        raise ArgumentTypeError(
+            f"unexpected output '{value}'. A comma-separated list of json, puml, png or none was expected"
+        )
+    return stages
+
 
 class CLI:
     def __init__(self) -> None:
@@ -104,16 +138,80 @@ class CLI:
             type=int,
             help='Set max edges in scheme',
         )
+        self.args_parser.add_argument(
+            '--no-cache',
+            dest='no_cache',
+            action='store_true',
+            default=False,
+            help='Do not read or write the parsed ontology, remote import and rendered image caches',
+        )
+        self.args_parser.add_argument(
+            '--cache-dir',
+            dest='cache_dir',
+            type=str,
+            help='Directory of the parsed ontology, remote import and rendered image caches',
+        )
+        self.args_parser.add_argument(
+            '--offline',
+            action='store_true',
+            default=False,
+            help='Take remote imports from the cache only',
+        )
+        self.args_parser.add_argument(
+            '--cache-stats',
+            dest='cache_stats',
+            action='store_true',
+            default=False,
+            help='Print the hits and misses of the caches at the end of the run',
+        )
+        self.args_parser.add_argument(
+            '-j',
+            '--jobs',
+            type=int,
+            default=1,
+            help='Number of worker processes to process the files, or the imports of a single file, with',
+        )
+        self.args_parser.add_argument(
+            '--emit',
+            type=parse_emit,
+            default=EMIT_STAGES,
+            help='Comma-separated outputs to write: json, puml, png (default: all of them), or none to only validate the files',
+        )
+        self.args_parser.add_argument(
+            '--renderer',
+            type=str,
+            help='PlantUML server URL, plantuml.jar path, plantuml command or Graphviz dot command to render PNG files with; prefix a jar path or plantuml command with local: to start PlantUML for every file instead of keeping it running (default: $ONTOL_RENDERER or the public PlantUML server)',
+        )
 
         self.parser: Parser = Parser()
         self.serializer: JSONSerializer = JSONSerializer()
         self.plantuml: PlantUML = PlantUML()
+        self.dot: DotGenerator = DotGenerator()
         self.retranslator: Retranslator = Retranslator()
-        self.ai: AI = AI()
+        # Hits and misses of the caches of worker processes, by cache name
+        self.worker_cache_stats: dict[str, tuple[int, int]] = {}
+        self._ai: Optional['AI'] = None
 
-    def run(self) -> None:
-        args: Namespace = self.args_parser.parse_args()
+    @property
+    def ai(self) -> 'AI':
+        if self._ai is None:
+            from ontol.ai import AI
 
+            self._ai = AI()
+        return self._ai
+
+    def run(self) -> int:
+        args: Namespace = self.args_parser.parse_args()
+        self.configure(args)
+        try:
+            return self.process_files(args)
+        finally:
+            # Stops the PlantUML process of a local renderer
+            self.plantuml.renderer.close()
+            if args.cache_stats:
+                self.print_cache_stats()
+
+    def process_files(self, args: Namespace) -> int:
         file_paths = self.get_file_paths(args.file)
         # Ensure we attempt to parse even non-existent files
         if not file_paths:
@@ -122,9 +220,81 @@ class CLI:
         if args.watch:
             for file_path in file_paths:
                 self.watch_file(file_path, args)
+            return 0
+
+        if args.jobs > 1 and len(file_paths) > 1:
+            results: list[bool] = self.parse_files_in_parallel(file_paths, args)
         else:
-            for file_path in file_paths:
-                self.parse_file(file_path, args)
+            results = [self.parse_file(file_path, args) for file_path in file_paths]
+        return 0 if all(results) else 1
+
+    def configure(self, args: Namespace) -> None:
+        self.plantuml.renderer = get_renderer(args.renderer)
+        # A single file spreads the parse of its imports over the processes
+        self.parser.jobs = args.jobs
+
+        if not args.no_cache:
+            cache_dir: str = args.cache_dir or get_cache_dir()
+            self.parser.fetcher = SourceFetcher(
+                http_cache=HTTPCache(
+                    os.path.join(cache_dir, 'http'), offline=args.offline
+                )
+            )
+            self.parser.ontology_cache = OntologyCache(
+                os.path.join(cache_dir, 'ontologies'), fetcher=self.parser.fetcher
+            )
+            self.plantuml.render_cache = RenderCache(os.path.join(cache_dir, 'renders'))
+
+    def get_cache_stats(self) -> dict[str, tuple[int, int]]:
+        # Hits and misses of the caches of this process, by subdirectory name
+        caches: dict[str, Optional[DiskCache]] = {
+            'ontologies': self.parser.ontology_cache,
+            'http': self.parser.fetcher.http_cache,
+            'renders': self.plantuml.render_cache,
+        }
+        return {
+            name: (cache.hits, cache.misses)
+            for name, cache in caches.items()
+            if cache is not None
+        }
+
+    def print_cache_stats(self) -> None:
+        stats: dict[str, tuple[int, int]] = self.get_cache_stats()
+        if not stats:
+            print('Caches are disabled')
+            return
+        print('Cache statistics:')
+        for name, (hits, misses) in stats.items():
+            worker_hits, worker_misses = self.worker_cache_stats.get(name, (0, 0))
+            print(
+                f'  {name}: {hits + worker_hits} hits, {misses + worker_misses} misses'
+            )
+
+    def parse_files_in_parallel(
+        self, file_paths: List[str], args: Namespace
+    ) -> list[bool]:
+        # Every worker keeps its own CLI (and so its import cache) for all the
+        # files it processes, while the ontology and HTTP caches on disk are
+        # shared by all of them. The output of each file is printed in the
+        # order of the files, as with a single process.
+        results: list[bool] = []
+        with ProcessPoolExecutor(
+            min(args.jobs, len(file_paths)),
+            initializer=_init_worker,
+            initargs=(args,),
+        ) as executor:
+            for output, success, stats in executor.map(
+                _process_file, file_paths, repeat(args)
+            ):
+                print(output, end='')
+                results.append(success)
+                for name, (hits, misses) in stats.items():
+                    total_hits, total_misses = self.worker_cache_stats.get(name, (0, 0))
+                    self.worker_cache_stats[name] = (
+                        total_hits + hits,
+                        total_misses + misses,
+                    )
+        return results
 
     def get_file_paths(self, path: str) -> List[str]:
         # Check if the path is a directory
@@ -135,12 +305,12 @@ class CLI:
                 for file in files:
                     if file.endswith('.ontol'):
                         ontol_files.append(os.path.join(root, file))
-            return ontol_files
+            return sorted(ontol_files)
         # If not a directory, assume it's a pattern or a file
         else:
-            return glob.glob(path, recursive=True)
+            return sorted(glob.glob(path, recursive=True))
 
-    def parse_file(self, file_path: str, args: Optional[Namespace] = None) -> None:
+    def parse_file(self, file_path: str, args: Optional[Namespace] = None) -> bool:
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
                 content: str = file.read()
@@ -152,13 +322,18 @@ class CLI:
                     and (count := ontology.count_edges()) > args.max_edges
                 ):
                     warnings.append(
-                        f'{constants.warning_prefix} too much edges. Expected: '
-                        f'{args.max_edges}, got: {count}'
+                        Diagnostic(
+                            file_path,
+                            None,
+                            None,
+                            None,
+                            f'Too much edges. Expected: {args.max_edges}, got: {count}',
+                        )
                     )
 
                 # Print warnings
                 if warnings and (not args or not args.quiet):
-                    print('\n\n'.join(warnings))
+                    print('\n\n'.join(map(str, warnings)))
 
                 if args and args.gen_hierarchy:
                     print('Generating hierarchy...')
@@ -172,6 +347,11 @@ class CLI:
                             f'{relationship.parent.name} {relationship.relationship.value} {relationship.children[0].name}: {comment}'
                         )
 
+                emit: frozenset[str] = args.emit if args else EMIT_STAGES
+                retranslate: bool = not args or args.debug
+                if not emit and not retranslate:
+                    return True
+
                 base_dir = os.path.dirname(file_path)
                 base_name = os.path.splitext(os.path.basename(file_path))[0]
                 output_dir = args.output_dir if args and args.output_dir else base_dir
@@ -202,22 +382,46 @@ class CLI:
                     ontologies.extend(new_ontologies)
                     base_names.extend(new_base_names)
 
+                diagrams: list[tuple[str, str]] = []
                 for ontology, base_name in zip(ontologies, base_names):
                     # JSON
-                    json_content: str = self.serializer.serialize(ontology)
-                    json_file_path: str = os.path.join(output_dir, f'{base_name}.json')
-                    with open(json_file_path, 'w', encoding='utf-8') as json_file:
-                        json_file.write(json_content)
+                    if 'json' in emit:
+                        json_content: str = self.serializer.serialize(ontology)
+                        json_file_path: str = os.path.join(
+                            output_dir, f'{base_name}.json'
+                        )
+                        with open(json_file_path, 'w', encoding='utf-8') as json_file:
+                            json_file.write(json_content)
 
                     # PlantUML
-                    plantuml_content: str = self.plantuml.generate(ontology)
-                    puml_file_path: str = os.path.join(output_dir, f'{base_name}.puml')
-                    with open(puml_file_path, 'w', encoding='utf-8') as puml_file:
-                        puml_file.write(plantuml_content)
-                    self.plantuml.processes_puml_to_png(puml_file_path)
+                    plantuml_content: Optional[str] = None
+                    if 'png' in emit:
+                        if self.plantuml.renderer.language == 'dot':
+                            # Graphviz renders its own DOT text directly
+                            diagram_content: str = self.dot.generate(ontology)
+                        else:
+                            plantuml_content = self.plantuml.generate(ontology)
+                            diagram_content = plantuml_content
+                        diagrams.append(
+                            (
+                                diagram_content,
+                                os.path.join(output_dir, f'{base_name}.png'),
+                            )
+                        )
+                    if 'puml' in emit:
+                        puml_file_path: str = os.path.join(
+                            output_dir, f'{base_name}.puml'
+                        )
+                        with open(puml_file_path, 'w', encoding='utf-8') as puml_file:
+                            # Unless PlantUML renders the PNG file, the text is
+                            # not needed in memory, so it is streamed to the file
+                            if plantuml_content is not None:
+                                puml_file.write(plantuml_content)
+                            else:
+                                self.plantuml.write(ontology, puml_file)
 
                     # Retranslator
-                    if args and not args.debug:
+                    if not retranslate:
                         continue
                     retranslator_content: str = self.retranslator.translate(ontology)
                     retranslator_file_path: str = os.path.join(
@@ -227,10 +431,16 @@ class CLI:
                         retranslator_file_path, 'w', encoding='utf-8'
                     ) as retr_file:
                         retr_file.write(retranslator_content)
+
+                if diagrams:
+                    self.plantuml.render_pngs(diagrams)
         except FileNotFoundError:
             print(f"{constants.error_prefix} the file '{file_path}' does not exist.")
+            return False
         except Exception as e:
             print(f'{constants.error_prefix} error processing file {file_path}: {e}')
+            return False
+        return True
 
     def watch_file(self, file_path: str, args: Optional[Namespace] = None):
         self.parse_file(file_path, args)
@@ -267,9 +477,35 @@ class CLI:
         return file_postfix
 
 
+_worker_cli: Optional[CLI] = None
+
+
+def _init_worker(args: Namespace) -> None:
+    global _worker_cli
+    _worker_cli = CLI()
+    _worker_cli.configure(args)
+    # The files are already spread over the processes
+    _worker_cli.parser.jobs = 1
+
+
+def _process_file(
+    file_path: str, args: Namespace
+) -> tuple[str, bool, dict[str, tuple[int, int]]]:
+    # Returns the cache hits and misses of this file along with its output
+    output: io.StringIO = io.StringIO()
+    before: dict[str, tuple[int, int]] = _worker_cli.get_cache_stats()
+    with redirect_stdout(output):
+        success: bool = _worker_cli.parse_file(file_path, args)
+    stats: dict[str, tuple[int, int]] = {
+        name: (hits - before[name][0], misses - before[name][1])
+        for name, (hits, misses) in _worker_cli.get_cache_stats().items()
+    }
+    return output.getvalue(), success, stats
+
+
 def main():
     cli: CLI = CLI()
-    cli.run()
+    sys.exit(cli.run())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,242 @@
+from typing import Any, Iterator, Optional, TYPE_CHECKING
+
+from sly.lex import Token
+
+from ontol import Ontology
+
+if TYPE_CHECKING:
+    from ontol.parser import Parser
+
+
+# Tokens that may follow a complete statement. The LALR parser checks the
+# lookahead against this set before running the statement action, so the
+# same check is done here to report the same error first.
+STATEMENT_FOLLOW: frozenset[Optional[str]] = frozenset(
+    {
+        None,
+        'IDENTIFIER',
+        'IMPORT_KEYWORD',
+        'TYPES_BLOCK',
+        'FUNCTIONS_BLOCK',
+        'HIERARCHY_BLOCK',
+        'FIGURE_BLOCK',
+        'NEWLINE',
+    }
+)
+ATTRIBUTE_FOLLOW: frozenset[Optional[str]] = frozenset({'COMMA', 'NEWLINE', 'RBRACE'})
+ATTRIBUTES_FOLLOW: frozenset[Optional[str]] = frozenset({'NEWLINE'})
+
+
+class DescentParser:
+    # Hand-written recursive-descent engine for the grammar declared in
+    # Parser. It accepts the same language (including the shift preferences
+    # sly picks for the grammar conflicts) and runs the same Parser actions in
+    # the same order, so ontologies and diagnostics are identical.
+    def __init__(self, parser: 'Parser', tokens: Iterator[Token]) -> None:
+        self.parser: 'Parser' = parser
+        self.tokens: Iterator[Token] = tokens
+        self.lookahead: Optional[Token] = None
+        self.has_lookahead: bool = False
+
+    def parse(self) -> Ontology:
+        while self._peek_type() is not None:
+            self._statement()
+        return self.parser._complete_ontology()
+
+    def _peek(self) -> Optional[Token]:
+        if not self.has_lookahead:
+            self.lookahead = next(self.tokens, None)
+            self.has_lookahead = True
+        return self.lookahead
+
+    def _peek_type(self) -> Optional[str]:
+        token: Optional[Token] = self._peek()
+        return token.type if token is not None else None
+
+    def _advance(self) -> Optional[Token]:
+        token: Optional[Token] = self._peek()
+        self.has_lookahead = False
+        return token
+
+    def _accept(self, token_type: str) -> Optional[Token]:
+        if self._peek_type() == token_type:
+            return self._advance()
+        return None
+
+    def _expect(self, token_type: str) -> Token:
+        if self._peek_type() != token_type:
+            self.parser.error(self._peek())
+        return self._advance()
+
+    def _expect_follow(self, follow: frozenset[Optional[str]]) -> None:
+        if self._peek_type() not in follow:
+            self.parser.error(self._peek())
+
+    def _statement(self) -> None:
+        token_type: Optional[str] = self._peek_type()
+
+        if token_type == 'NEWLINE':
+            self._advance()
+        elif token_type == 'IDENTIFIER':
+            self._meta()
+        elif token_type == 'IMPORT_KEYWORD':
+            self._import()
+        elif token_type == 'TYPES_BLOCK':
+            self._block(self._type)
+        elif token_type == 'FUNCTIONS_BLOCK':
+            self._block(self._function)
+        elif token_type == 'HIERARCHY_BLOCK':
+            self._block(self._relationship)
+        elif token_type == 'FIGURE_BLOCK':
+            self._figure()
+        else:
+            self.parser.error(self._peek())
+
+    def _meta(self) -> None:
+        tag_token: Token = self._advance()
+        colon_token: Token = self._expect('COLON')
+        value_token: Token = self._expect('STRING')
+        self._expect('NEWLINE')
+        self._expect_follow(STATEMENT_FOLLOW)
+        self.parser._set_meta(tag_token, colon_token, value_token)
+
+    def _import(self) -> None:
+        self._advance()
+
+        if self._peek_type() == 'ASTERISK':
+            asterisk_token: Token = self._advance()
+            self._expect('FROM_KEYWORD')
+            src_token: Token = self._expect('STRING')
+            self._expect_follow(STATEMENT_FOLLOW)
+            self.parser._import_ontology(src_token, None, asterisk_token)
+            return
+
+        import_tokens: list[tuple] = []
+        if self._peek_type() == 'LBRACE':
+            import_tokens = self._list('LBRACE', 'RBRACE', self._import_identifier)
+        self._expect('FROM_KEYWORD')
+        src_token = self._expect('STRING')
+        self._expect_follow(STATEMENT_FOLLOW)
+        self.parser._import_ontology(src_token, import_tokens)
+
+    def _import_identifier(self) -> tuple:
+        name_token: Token = self._expect('IDENTIFIER')
+        if self._accept('AS_KEYWORD') is None:
+            return (name_token, None)
+        return (name_token, self._expect('IDENTIFIER'))
+
+    def _block(self, definition) -> None:
+        # types/functions/hierarchy blocks: blank lines are only allowed right
+        # after the header, then every definition is ended by one NEWLINE
+        self._advance()
+        self._expect('COLON')
+        self._expect('NEWLINE')
+        while self._accept('NEWLINE') is not None:
+            pass
+        while self._peek_type() == 'IDENTIFIER':
+            definition()
+            self._expect('NEWLINE')
+
+    def _type(self) -> None:
+        name_token: Token = self._advance()
+        self._expect('COLON')
+        label_token: Token = self._expect('STRING')
+        self._expect('COMMA')
+        description_token: Token = self._expect('STRING')
+        attributes: list[tuple] = self._attributes()
+        self.parser._add_type(name_token, label_token, description_token, attributes)
+
+    def _function(self) -> None:
+        name_token: Token = self._advance()
+        self._expect('COLON')
+        label_token: Token = self._expect('STRING')
+        params: list[tuple] = self._list('LPAREN', 'RPAREN', self._param)
+        input_types = self.parser._resolve_params(params)
+        self._expect('ARROW')
+        output_term_token: Token = self._expect('IDENTIFIER')
+        self._expect('COLON')
+        output_label_token: Token = self._expect('STRING')
+        attributes: list[tuple] = self._attributes()
+        self.parser._add_function(
+            name_token,
+            label_token,
+            input_types,
+            output_term_token,
+            output_label_token,
+            attributes,
+        )
+
+    def _param(self) -> tuple:
+        term_token: Token = self._expect('IDENTIFIER')
+        self._expect('COLON')
+        return (term_token, self._expect('STRING'))
+
+    def _relationship(self) -> None:
+        name_token: Optional[Token] = None
+        parent_token: Token = self._advance()
+        if self._accept('COLON') is not None:
+            name_token = parent_token
+            parent_token = self._expect('IDENTIFIER')
+        relationship_type_token: Token = self._expect('IDENTIFIER')
+        child_token: Token = self._expect('IDENTIFIER')
+        attributes: list[tuple] = self._attributes()
+        self.parser._add_relationship(
+            name_token,
+            parent_token,
+            relationship_type_token,
+            child_token,
+            attributes,
+        )
+
+    def _figure(self) -> None:
+        self._advance()
+        name_token: Token = self._expect('STRING')
+        self._expect('COLON')
+        self._expect('NEWLINE')
+        while self._accept('NEWLINE') is not None:
+            pass
+
+        identifier_tokens: list[Token] = []
+        while self._peek_type() == 'IDENTIFIER':
+            identifier_tokens.append(self._advance())
+            self._expect('NEWLINE')
+
+        self._expect_follow(STATEMENT_FOLLOW)
+        self.parser._add_figure(name_token, identifier_tokens)
+
+    def _attributes(self) -> list[tuple]:
+        if self._peek_type() != 'COMMA':
+            self._expect_follow(ATTRIBUTES_FOLLOW)
+            return []
+        self._advance()
+        return self._list('LBRACE', 'RBRACE', self._attribute)
+
+    def _attribute(self) -> tuple[Any, Any]:
+        key_token: Token = self._expect('IDENTIFIER')
+        self._expect('COLON')
+        value_token: Token = self._expect('STRING')
+        self._expect_follow(ATTRIBUTE_FOLLOW)
+        return self.parser._attribute(key_token, value_token)
+
+    def _list(self, opening: str, closing: str, item) -> list:
+        # Shared shape of attribute, parameter and import lists:
+        #   OPEN [NEWLINE] [item] (COMMA [NEWLINE] item)* [NEWLINE] CLOSE
+        # where a trailing "COMMA NEWLINE CLOSE" is only allowed when the list
+        # starts with a NEWLINE.
+        self._expect(opening)
+        leading_newline: bool = self._accept('NEWLINE') is not None
+
+        items: list = []
+        if self._peek_type() == 'IDENTIFIER':
+            items.append(item())
+
+        while self._accept('COMMA') is not None:
+            if self._accept('NEWLINE') is not None:
+                if leading_newline and self._peek_type() == closing:
+                    self._advance()
+                    return items
+            items.append(item())
+
+        self._accept('NEWLINE')
+        self._expect(closing)
+        return items
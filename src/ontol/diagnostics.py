@@ -0,0 +1,92 @@
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Literal, Optional
+
+from ontol import constants
+
+
+class SourceLines:
+    def __init__(self, content: str) -> None:
+        self.lines: list[str] = content.splitlines()
+        # Offset of the first character of every line, built once per parse so
+        # that column lookups are a bisect instead of a sum over previous lines
+        self.offsets: list[int] = list(
+            accumulate((len(line) + 1 for line in self.lines), initial=0)
+        )
+
+    def line(self, line_number: int) -> str:
+        if 0 < line_number <= len(self.lines):
+            return self.lines[line_number - 1]
+        return ''
+
+    def column(self, index: int) -> int:
+        return index - self.offsets[bisect_right(self.offsets, index) - 1]
+
+
+class Diagnostic:
+    __slots__ = (
+        'file_path',
+        'source',
+        'line_number',
+        'index',
+        'message',
+        'type',
+        '_text',
+    )
+
+    # A warning or error of a parse. str() renders it with the line it points
+    # to, or as the message alone for diagnostics about the whole file (no
+    # line_number).
+    def __init__(
+        self,
+        file_path: str,
+        source: Optional[SourceLines],
+        line_number: Optional[int],
+        index: Optional[int],
+        message: str,
+        type: Literal['warning', 'error'] = 'warning',
+    ) -> None:
+        self.file_path: str = file_path
+        self.source: Optional[SourceLines] = source
+        self.line_number: Optional[int] = line_number
+        self.index: Optional[int] = index
+        self.message: str = message
+        self.type: Literal['warning', 'error'] = type
+        self._text: Optional[str] = None
+
+    def __str__(self) -> str:
+        # The message is only rendered once it is actually displayed. The
+        # source is read once, as another thread may render the message and
+        # release the source meanwhile; _text is always set before that.
+        if self._text is None:
+            source: Optional[SourceLines] = self.source
+            if source is None and self.line_number is not None:
+                return self._text
+            self._text = self._render(source)
+            self.source = None
+        return self._text
+
+    def __repr__(self) -> str:
+        return f'Diagnostic(type={self.type}, file_path={self.file_path}, line={self.line_number}, message={self.message})'
+
+    def _render(self, source: Optional[SourceLines]) -> str:
+        line_padding: int = 4
+        message_prefix: str = (
+            constants.warning_prefix
+            if self.type == 'warning'
+            else constants.error_prefix
+        )
+
+        if self.line_number is None:
+            return f'{message_prefix} {self.message[0].lower() + self.message[1:]}'
+
+        final_message: str = f'File "{self.file_path}", line {self.line_number}'
+        final_message += f'\n{" " * line_padding}{source.line(self.line_number)}'
+        if self.index is not None:
+            column_index: int = source.column(self.index)
+            final_message += f'\n{" " * line_padding}{" " * column_index}^'
+        final_message += (
+            f'\n{message_prefix} {self.message[0].lower() + self.message[1:]}'
+        )
+
+        return final_message
@@ -0,0 +1,499 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterator, Optional, TYPE_CHECKING
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ontol import Ontology
+from ontol.diagnostics import Diagnostic
+
+if TYPE_CHECKING:
+    from ontol.cache import HTTPCache
+
+
+class ParsedOntology:
+    # Result of parsing one imported file. warnings keeps the file's own
+    # diagnostics interleaved with the ParsedOntology of every file it imports
+    # so that the warnings of a shared import can be reported once per parse.
+    # Nested entries only need key and warnings, so their ontology may be None.
+    __slots__ = ('key', 'ontology', 'warnings')
+
+    def __init__(
+        self,
+        key: tuple[str, ...],
+        ontology: Optional[Ontology],
+        warnings: list['Diagnostic | ParsedOntology'],
+    ) -> None:
+        self.key: tuple[str, ...] = key
+        self.ontology: Optional[Ontology] = ontology
+        self.warnings: list[Diagnostic | ParsedOntology] = warnings
+
+    def without_imported_ontologies(self) -> 'ParsedOntology':
+        # Copy that drops the ontologies of nested entries, which are already
+        # merged into this ontology, e.g. to send it to another process
+        return ParsedOntology(
+            self.key,
+            self.ontology,
+            [
+                ParsedOntology(
+                    warning.key,
+                    None,
+                    warning.without_imported_ontologies().warnings,
+                )
+                if isinstance(warning, ParsedOntology)
+                else warning
+                for warning in self.warnings
+            ],
+        )
+
+
+def flatten_warnings(
+    warnings: list['Diagnostic | ParsedOntology'],
+    seen: Optional[set[tuple[str, ...]]] = None,
+) -> list[Diagnostic]:
+    if seen is None:
+        seen = set()
+
+    flat_warnings: list[Diagnostic] = []
+    for warning in warnings:
+        if isinstance(warning, ParsedOntology):
+            if warning.key in seen:
+                continue
+            seen.add(warning.key)
+            flat_warnings.extend(flatten_warnings(warning.warnings, seen))
+        else:
+            flat_warnings.append(warning)
+
+    return flat_warnings
+
+
+def get_import_keys(
+    warnings: list['Diagnostic | ParsedOntology'],
+    keys: Optional[dict[tuple[str, ...], None]] = None,
+) -> list[tuple[str, str]]:
+    # Source and content hash of every file imported directly or transitively,
+    # in import order
+    if keys is None:
+        keys = {}
+
+    for warning in warnings:
+        if isinstance(warning, ParsedOntology) and warning.key not in keys:
+            keys[warning.key] = None
+            get_import_keys(warning.warnings, keys)
+
+    return list(dict.fromkeys((key[0], key[1]) for key in keys))
+
+
+def get_source_key(source: str, content: str) -> tuple[str, str]:
+    return normalize_source(source), get_content_hash(content)
+
+
+def get_content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ImportCache:
+    # Parsed imports keyed by resolved path/URL and content hash. The cache is
+    # bounded (least recently used entries are evicted first), so a Parser
+    # can keep it between parses in long-lived processes. It may be shared by
+    # concurrent parses.
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries: int = max_entries
+        self.entries: OrderedDict[tuple[str, ...], ParsedOntology] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def get(
+        self,
+        key: tuple[str, ...],
+        is_current: Optional[Callable[[ParsedOntology], bool]] = None,
+    ) -> Optional[ParsedOntology]:
+        # An entry also holds everything its file imports, while the key only
+        # covers the file itself, so is_current checks the nested entries.
+        # Outdated entries are dropped.
+        with self.lock:
+            parsed: Optional[ParsedOntology] = self.entries.get(key)
+            if parsed is not None and is_current is not None and not is_current(parsed):
+                del self.entries[key]
+                parsed = None
+            if parsed is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return parsed
+
+    def put(self, parsed: ParsedOntology) -> None:
+        with self.lock:
+            self.entries[parsed.key] = parsed
+            self.entries.move_to_end(parsed.key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def is_url(source: str) -> bool:
+    try:
+        result = urlparse(source)
+        return bool(result.scheme and result.netloc)
+    except ValueError:
+        return False
+
+
+def resolve_source(source: str, file_path: str) -> str:
+    # Local imports are relative to the importing file
+    if is_url(source) or os.path.isabs(source):
+        return source
+    return os.path.join(os.path.dirname(file_path), source)
+
+
+def normalize_source(source: str) -> str:
+    return source if is_url(source) else os.path.realpath(source)
+
+
+def scan_imports(tokens: Iterator[Any]) -> list[Any]:
+    # Source tokens of the import statements
+    source_tokens: list[Any] = []
+    previous_type: Optional[str] = None
+    try:
+        for token in tokens:
+            if token.type == 'STRING' and previous_type == 'FROM_KEYWORD':
+                source_tokens.append(token)
+            previous_type = token.type
+    except SyntaxError:
+        # The parse itself reports lexing errors
+        pass
+    return source_tokens
+
+
+class DefinitionIndex:
+    # Spans of the definitions of a file without imports, found from its token
+    # stream. It lets selective imports parse only the requested definitions
+    # and the terms they reference: every other definition (and every figure)
+    # is blanked out, keeping the newlines so that line numbers do not change.
+    __slots__ = ('spans', 'names', 'references')
+
+    blocks: dict[str, str] = {
+        'TYPES_BLOCK': 'types',
+        'FUNCTIONS_BLOCK': 'functions',
+        'HIERARCHY_BLOCK': 'hierarchy',
+        'FIGURE_BLOCK': 'figure',
+    }
+
+    def __init__(self) -> None:
+        self.spans: list[tuple[int, int]] = []
+        self.names: dict[str, int] = {}
+        self.references: list[list[str]] = []
+
+    @classmethod
+    def from_tokens(
+        cls, tokens: Iterator[Any], length: int
+    ) -> Optional['DefinitionIndex']:
+        # None if the file can not be indexed because it has imports (whose
+        # definitions are only known after parsing them) or duplicated names
+        index: DefinitionIndex = cls()
+        block: Optional[str] = None
+        has_items: bool = False
+        definition: Optional[list[Any]] = None
+        depth: int = 0
+        line_start: bool = True
+        previous_newline: bool = False
+
+        try:
+            for token in tokens:
+                if token.type == 'NEWLINE' and depth == 0:
+                    if definition is not None:
+                        if not index._add(block, definition, token.index):
+                            return None
+                        definition = None
+                    elif previous_newline and has_items:
+                        # Like in the grammar, a second newline token (after
+                        # a comment line) ends the block
+                        block = None
+                    line_start = True
+                    previous_newline = True
+                    continue
+
+                previous_newline = False
+                if token.type in ('LBRACE', 'LPAREN'):
+                    depth += 1
+                elif token.type in ('RBRACE', 'RPAREN'):
+                    depth -= 1
+
+                if line_start:
+                    line_start = False
+                    if token.type == 'IMPORT_KEYWORD':
+                        return None
+                    if token.type in cls.blocks:
+                        block = cls.blocks[token.type]
+                        has_items = False
+                        # Figures are never imported, so their headers are
+                        # blanked out together with their items
+                        definition = [token] if block == 'figure' else None
+                    elif token.type == 'IDENTIFIER' and block is not None:
+                        has_items = True
+                        definition = [token]
+                    else:
+                        block = None
+                    continue
+
+                if definition is not None:
+                    definition.append(token)
+        except SyntaxError:
+            return None
+
+        if definition is not None and not index._add(block, definition, length):
+            return None
+        return index
+
+    def _add(self, block: Optional[str], tokens: list[Any], end: int) -> bool:
+        name: Optional[str] = None
+        references: list[str] = []
+
+        if block == 'types':
+            name = tokens[0].value
+        elif block == 'functions':
+            name = tokens[0].value
+            depth: int = 0
+            for previous, token in zip(tokens, tokens[1:]):
+                if token.type == 'LPAREN':
+                    depth += 1
+                elif token.type == 'RPAREN':
+                    depth -= 1
+                elif token.type == 'IDENTIFIER' and (
+                    depth > 0 or previous.type == 'ARROW'
+                ):
+                    references.append(token.value)
+        elif block == 'hierarchy':
+            identifiers: list[Any] = tokens
+            if len(tokens) > 1 and tokens[1].type == 'COLON':
+                name = tokens[0].value
+                identifiers = tokens[2:]
+            references = [token.value for token in identifiers[:3:2]]
+
+        if name is not None:
+            if name in self.names:
+                return False
+            self.names[name] = len(self.spans)
+        self.spans.append((tokens[0].index, end))
+        self.references.append(references)
+        return True
+
+    def mask(self, file_content: str, names: list[str]) -> str:
+        # Blanks out every definition that the given names do not need
+        kept: set[int] = set()
+        stack: list[str] = list(names)
+        while stack:
+            position: Optional[int] = self.names.get(stack.pop())
+            if position is not None and position not in kept:
+                kept.add(position)
+                stack.extend(self.references[position])
+
+        parts: list[str] = []
+        offset: int = 0
+        for position, (start, end) in enumerate(self.spans):
+            if position in kept:
+                continue
+            # The indentation goes too, since newlines separated by spaces
+            # would be lexed as two newline tokens
+            start = file_content.rfind('\n', 0, start) + 1
+            parts.append(file_content[offset:start])
+            parts.append('\n' * file_content.count('\n', start, end))
+            offset = end
+        parts.append(file_content[offset:])
+        return ''.join(parts)
+
+
+class ImportGraph:
+    # Transitive imports of a file, keyed by normalized source. paths keeps
+    # every source as its importer resolved it (and as diagnostics show it).
+    def __init__(self, root: str, root_path: str) -> None:
+        self.root: str = root
+        self.paths: dict[str, str] = {root: root_path}
+        self.imports: dict[str, list[tuple[str, Any]]] = {}
+
+    def find_cycle(self) -> Optional[list[tuple[str, Any]]]:
+        # Iterative depth-first search, so that long import chains do not hit
+        # the recursion limit. A cycle is returned as (source, import token)
+        # pairs, each token importing the source of the next pair.
+        visited: set[str] = {self.root}
+        path: list[str] = [self.root]
+        path_tokens: list[Any] = []
+        on_path: dict[str, int] = {self.root: 0}
+        stack: list[Iterator[tuple[str, Any]]] = [iter(self.imports.get(self.root, []))]
+
+        while stack:
+            edge: Optional[tuple[str, Any]] = next(stack[-1], None)
+            if edge is None:
+                stack.pop()
+                del on_path[path.pop()]
+                if path_tokens:
+                    path_tokens.pop()
+                continue
+
+            target, token = edge
+            if target in on_path:
+                start: int = on_path[target]
+                tokens: list[Any] = path_tokens[start:] + [token]
+                return list(zip(path[start:], tokens))
+            if target in visited:
+                continue
+
+            visited.add(target)
+            on_path[target] = len(path)
+            path.append(target)
+            path_tokens.append(token)
+            stack.append(iter(self.imports.get(target, [])))
+
+        return None
+
+
+class SourceFetcher:
+    # Reads imported sources. prefetch() discovers the imports of a file (and
+    # of everything it imports) from its token stream and reads them all
+    # concurrently, so the parse itself only takes their contents from memory.
+    def __init__(
+        self,
+        max_workers: int = 8,
+        timeout: float = 30.0,
+        session: Optional[requests.Session] = None,
+        http_cache: Optional['HTTPCache'] = None,
+    ) -> None:
+        self.max_workers: int = max_workers
+        self.http_cache: Optional['HTTPCache'] = http_cache
+        self.timeout: float = timeout
+        self.session: Optional[requests.Session] = session
+        self.contents: dict[str, str | Exception] = {}
+        self.content_hashes: dict[str, str] = {}
+        self.lock: threading.Lock = threading.Lock()
+
+    def get_session(self) -> requests.Session:
+        with self.lock:
+            if self.session is None:
+                session: requests.Session = requests.Session()
+                adapter: HTTPAdapter = HTTPAdapter(
+                    pool_connections=self.max_workers, pool_maxsize=self.max_workers
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self.session = session
+            return self.session
+
+    def fork(self) -> 'SourceFetcher':
+        # Prefetched contents belong to one parse, so concurrent parses each
+        # use a fork sharing the connection pool and the HTTP cache
+        return SourceFetcher(
+            self.max_workers, self.timeout, self.get_session(), self.http_cache
+        )
+
+    def fetch(self, source: str) -> str:
+        if is_url(source):
+            if self.http_cache is not None:
+                return self.http_cache.fetch(self.get_session(), source, self.timeout)
+            response: requests.Response = self.get_session().get(
+                source, timeout=self.timeout
+            )
+            response.raise_for_status()
+            if isinstance(response.content, bytes):
+                return response.content.decode('utf-8')
+            return response.text
+
+        with open(source, 'r', encoding='utf-8') as file:
+            return file.read()
+
+    def fetch_all(self, sources: list[str]) -> dict[str, str | Exception]:
+        # Reads the sources concurrently. A source that could not be read maps
+        # to its error.
+        if len(sources) < 2:
+            return {source: self._fetch_or_error(source) for source in sources}
+        with ThreadPoolExecutor(min(self.max_workers, len(sources))) as executor:
+            return dict(zip(sources, executor.map(self._fetch_or_error, sources)))
+
+    def _fetch_or_error(self, source: str) -> str | Exception:
+        try:
+            return self.fetch(source)
+        except Exception as error:
+            return error
+
+    def read(self, source: str) -> str:
+        content: Optional[str | Exception] = self.contents.get(normalize_source(source))
+        if content is None:
+            return self.fetch(source)
+        if isinstance(content, Exception):
+            raise content
+        return content
+
+    def has_contents(self, keys: list[tuple[str, str]]) -> bool:
+        # Whether the (normalized source, content hash) pairs still match the
+        # contents read by this parse. Sources it did not read are not
+        # checked: a worker of a parallel parse only gets the contents of the
+        # files it imports directly, and the others were parsed by this parse.
+        for source, content_hash in keys:
+            content: Optional[str | Exception] = self.contents.get(source)
+            if content is None:
+                continue
+            if isinstance(content, Exception):
+                return False
+            if source not in self.content_hashes:
+                self.content_hashes[source] = get_content_hash(content)
+            if self.content_hashes[source] != content_hash:
+                return False
+        return True
+
+    def prefetch(
+        self, file_content: str, file_path: str, lexer_class: type
+    ) -> ImportGraph:
+        root: str = normalize_source(file_path)
+        graph: ImportGraph = ImportGraph(root, file_path)
+        self.contents = {root: file_content}
+        self.content_hashes = {}
+
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            pending: dict[Future, str] = {}
+
+            def submit(source: str, content: str) -> None:
+                graph.imports[source] = []
+                # Most files have no imports, so they are not tokenized twice
+                if 'import' not in content:
+                    return
+                tokens: Iterator[Any] = lexer_class().tokenize(content)
+                for token in scan_imports(tokens):
+                    path: str = resolve_source(token.value, graph.paths[source])
+                    target: str = normalize_source(path)
+                    graph.imports[source].append((target, token))
+                    if target not in graph.paths:
+                        graph.paths[target] = path
+                        pending[executor.submit(self.fetch, path)] = target
+
+            submit(root, file_content)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source: str = pending.pop(future)
+                    try:
+                        content: str = future.result()
+                    except Exception as error:
+                        self.contents[source] = error
+                        continue
+                    self.contents[source] = content
+                    submit(source, content)
+
+        return graph
+
+    def clear(self) -> None:
+        self.contents = {}
+        self.content_hashes = {}
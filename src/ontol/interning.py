@@ -0,0 +1,68 @@
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import TypeVar
+
+from ontol import TermAttributes, FunctionAttributes, RelationshipAttributes
+
+Attributes = TypeVar(
+    'Attributes', TermAttributes, FunctionAttributes, RelationshipAttributes
+)
+
+# Short enum-like string values: colours, directions, sizes, single words
+ENUM_LIKE_VALUE: re.Pattern = re.compile(r'[\w#.+-]{0,32}')
+
+
+def intern_name(value: str) -> str:
+    # Identifiers repeat a lot (every reference to a term), so the lexers
+    # keep one copy of each
+    return sys.intern(value)
+
+
+def intern_string(value: str) -> str:
+    # Only short enum-like string values are interned. Labels, descriptions
+    # and notes are free-form text that rarely repeats, and interning them
+    # would only fill the interpreter's table.
+    if ENUM_LIKE_VALUE.fullmatch(value):
+        return sys.intern(value)
+    return value
+
+
+class Interner:
+    # Canonical attribute objects. Attribute classes are frozen, so equal
+    # attributes can be shared between definitions (and, through sub-parsers,
+    # between the ontologies of imported files) and between concurrent parses.
+    # The table is bounded (least recently used entries are evicted first),
+    # so a Parser can keep it between parses in long-lived processes.
+    __slots__ = ('max_entries', 'attributes', 'hits', 'lock')
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries: int = max_entries
+        self.attributes: OrderedDict[
+            TermAttributes | FunctionAttributes | RelationshipAttributes,
+            TermAttributes | FunctionAttributes | RelationshipAttributes,
+        ] = OrderedDict()
+        self.hits: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def intern_attributes(self, attributes: Attributes) -> Attributes:
+        with self.lock:
+            canonical = self.attributes.get(attributes)
+            if canonical is None:
+                self.attributes[attributes] = attributes
+                while len(self.attributes) > self.max_entries:
+                    self.attributes.popitem(last=False)
+                return attributes
+            if canonical is not attributes:
+                self.hits += 1
+            self.attributes.move_to_end(attributes)
+            return canonical
+
+    def clear(self) -> None:
+        with self.lock:
+            self.attributes.clear()
+            self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self.attributes)
@@ -1,10 +1,10 @@
 import copy
 from enum import Enum
-from typing import Optional
+from typing import Any, Optional
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class Meta:
     version: Optional[str] = None
     title: Optional[str] = None
@@ -31,7 +31,7 @@ class Meta:
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TermAttributes:
     color: Optional[str] = None
     note: Optional[str] = None
@@ -40,12 +40,17 @@ class TermAttributes:
         return f'TermAttributes(color={self.color}, note={self.note})'
 
 
-@dataclass
+# Attribute objects are immutable, so every definition without attributes
+# shares one empty instance instead of allocating its own
+EMPTY_TERM_ATTRIBUTES: TermAttributes = TermAttributes()
+
+
+@dataclass(slots=True)
 class Term:
     name: str
     label: str = ''
     description: str = ''
-    attributes: TermAttributes = field(default_factory=TermAttributes)
+    attributes: TermAttributes = EMPTY_TERM_ATTRIBUTES
 
     def __repr__(self) -> str:
         return f'Term(name={self.name}, label={self.label}, description={self.description}, attributes={self.attributes})'
@@ -84,7 +89,7 @@ class RelationshipType(Enum):
         return value in cls._value2member_map_
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FunctionAttributes:
     color: Optional[str] = None
     colorArrow: Optional[str] = None
@@ -102,7 +107,10 @@ class FunctionAttributes:
         )
 
 
-@dataclass
+EMPTY_FUNCTION_ATTRIBUTES: FunctionAttributes = FunctionAttributes()
+
+
+@dataclass(slots=True)
 class FunctionArgument:
     term: Term
     label: str = ''
@@ -111,13 +119,13 @@ class FunctionArgument:
         return f"('{self.term.name}', '{self.label}')"
 
 
-@dataclass
+@dataclass(slots=True)
 class Function:
     name: str
     label: str
     input_types: list[FunctionArgument]
     output_type: FunctionArgument
-    attributes: FunctionAttributes = field(default_factory=FunctionAttributes)
+    attributes: FunctionAttributes = EMPTY_FUNCTION_ATTRIBUTES
 
     def __repr__(self) -> str:
         return (
@@ -141,7 +149,7 @@ class Function:
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RelationshipAttributes:
     color: Optional[str] = None
     direction: Optional[RelationshipDirection] = None
@@ -159,13 +167,16 @@ class RelationshipAttributes:
         )
 
 
-@dataclass
+EMPTY_RELATIONSHIP_ATTRIBUTES: RelationshipAttributes = RelationshipAttributes()
+
+
+@dataclass(slots=True)
 class Relationship:
     parent: Term
     relationship: RelationshipType
     children: list[Term]
     name: Optional[str] = None
-    attributes: RelationshipAttributes = field(default_factory=RelationshipAttributes)
+    attributes: RelationshipAttributes = EMPTY_RELATIONSHIP_ATTRIBUTES
 
     def __repr__(self) -> str:
         return (
@@ -175,7 +186,7 @@ class Relationship:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Figure:
     name: str
     types: list[Term] = field(default_factory=list)
@@ -186,6 +197,73 @@ class Figure:
         return f'Figure(name={self.name}, tyoes={self.types}, functions={self.functions}, hierarchy={self.hierarchy})'
 
 
+class _DefinitionList(list):
+    # List of the definitions of an ontology that counts its changes, so that
+    # its name index can tell when it is out of date. The count is a class
+    # attribute until the first change, since unpickling extends the list
+    # before restoring its state.
+    version: int = 0
+
+
+def _counts_changes(method):
+    def change(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    return change
+
+
+for _method in (
+    '__setitem__',
+    '__delitem__',
+    '__iadd__',
+    '__imul__',
+    'append',
+    'extend',
+    'insert',
+    'pop',
+    'remove',
+    'clear',
+    'sort',
+    'reverse',
+):
+    setattr(_DefinitionList, _method, _counts_changes(getattr(list, _method)))
+
+
+# Name -> definition table kept alongside one of the ontology lists. The first
+# definition with a given name wins, like a linear scan would. The table is
+# rebuilt on the next lookup once the list is replaced or changed other than
+# through Ontology.add_*.
+class _NameIndex:
+    __slots__ = ('definitions', 'source', 'version')
+
+    def __init__(self) -> None:
+        self.definitions: dict[str, Any] = {}
+        self.source: Optional[_DefinitionList] = None
+        self.version: int = 0
+
+    def is_current(self, definitions: _DefinitionList) -> bool:
+        return self.source is definitions and self.version == definitions.version
+
+    def add(self, definitions: _DefinitionList, definition: Any) -> None:
+        current: bool = self.is_current(definitions)
+        definitions.append(definition)
+        if current:
+            if definition.name is not None:
+                self.definitions.setdefault(definition.name, definition)
+            self.version = definitions.version
+
+    def lookup(self, name: str, definitions: _DefinitionList) -> Optional[Any]:
+        if not self.is_current(definitions):
+            self.definitions = {}
+            for definition in definitions:
+                if definition.name is not None:
+                    self.definitions.setdefault(definition.name, definition)
+            self.source = definitions
+            self.version = definitions.version
+        return self.definitions.get(name)
+
+
 @dataclass
 class Ontology:
     meta: Meta = field(default_factory=Meta)
@@ -193,6 +271,23 @@ class Ontology:
     functions: list[Function] = field(default_factory=list)
     hierarchy: list[Relationship] = field(default_factory=list)
     figures: list[Figure] = field(default_factory=list)
+    _type_index: _NameIndex = field(
+        default_factory=_NameIndex, init=False, repr=False, compare=False
+    )
+    _function_index: _NameIndex = field(
+        default_factory=_NameIndex, init=False, repr=False, compare=False
+    )
+    _relationship_index: _NameIndex = field(
+        default_factory=_NameIndex, init=False, repr=False, compare=False
+    )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Definition lists are wrapped, so that the name indexes see them change
+        if name in ('types', 'functions', 'hierarchy') and not isinstance(
+            value, _DefinitionList
+        ):
+            value = _DefinitionList(value)
+        object.__setattr__(self, name, value)
 
     @staticmethod
     def from_figure(parent_ontology: 'Ontology', figure: Figure) -> 'Ontology':
@@ -204,13 +299,13 @@ class Ontology:
         )
 
     def add_type(self, type_def: Term) -> None:
-        self.types.append(type_def)
+        self._type_index.add(self.types, type_def)
 
     def add_function(self, func_def: Function) -> None:
-        self.functions.append(func_def)
+        self._function_index.add(self.functions, func_def)
 
     def add_relationship(self, relationship: Relationship) -> None:
-        self.hierarchy.append(relationship)
+        self._relationship_index.add(self.hierarchy, relationship)
 
     def add_figure(self, figure: Figure) -> None:
         self.figures.append(figure)
@@ -219,33 +314,25 @@ class Ontology:
         self.meta = meta
 
     def find_term_by_name(self, name: str) -> Optional[Term]:
-        return next((term for term in self.types if term.name == name), None)
+        return self._type_index.lookup(name, self.types)
 
     def find_function_by_name(self, name: str) -> Optional[Function]:
-        return next(
-            (function for function in self.functions if function.name == name), None
-        )
+        return self._function_index.lookup(name, self.functions)
 
     def find_relationship_by_name(self, name: str) -> Optional[Relationship]:
-        return next(
-            (
-                relationship
-                for relationship in self.hierarchy
-                if relationship.name == name
-            ),
-            None,
-        )
+        return self._relationship_index.lookup(name, self.hierarchy)
 
     def find_definition_by_name(
         self, name: str
     ) -> Optional[Term | Function | Relationship]:
-        definitions: list[Term | Function | Relationship] = (
-            self.types + self.functions + self.hierarchy
-        )
-        return next(
-            (definition for definition in definitions if definition.name == name),
-            None,
+        definition: Optional[Term | Function | Relationship] = self.find_term_by_name(
+            name
         )
+        if definition is None:
+            definition = self.find_function_by_name(name)
+        if definition is None:
+            definition = self.find_relationship_by_name(name)
+        return definition
 
     @property
     def without_functions(self) -> 'Ontology':
@@ -1,10 +1,16 @@
 import os
+import re
+import hashlib
+import pickle
 from urllib.parse import urlparse
-import requests
+import sly
 from sly import Lexer as BaseLexer, Parser as BaseParser
+from sly.lex import Token
+from sly.yacc import YaccError
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from datetime import datetime
-from typing import Literal, Optional, Any, Type
-from dataclasses import fields
+from typing import Literal, Optional, Any, Type, Iterator
+from dataclasses import fields, replace
 
 from ontol import (
     constants,
@@ -21,6 +27,26 @@ from ontol import (
     FunctionAttributes,
     RelationshipDirection,
 )
+from ontol.oast import (
+    EMPTY_TERM_ATTRIBUTES,
+    EMPTY_FUNCTION_ATTRIBUTES,
+    EMPTY_RELATIONSHIP_ATTRIBUTES,
+)
+from ontol.interning import Interner, intern_name, intern_string
+from ontol.diagnostics import Diagnostic, SourceLines
+from ontol.cache import get_cache_dir, load_pickle, dump_pickle, OntologyCache
+from ontol.descent import DescentParser
+from ontol.imports import (
+    ImportCache,
+    ParsedOntology,
+    flatten_warnings,
+    get_import_keys,
+    DefinitionIndex,
+    ImportGraph,
+    resolve_source,
+    SourceFetcher,
+    get_source_key,
+)
 
 
 class Lexer(BaseLexer):
@@ -81,7 +107,11 @@ class Lexer(BaseLexer):
 
     # Strings handling
     def STRING(self, t):
-        t.value = t.value[1:-1]  # Remove quotes
+        t.value = intern_string(t.value[1:-1])  # Remove quotes
+        return t
+
+    def IDENTIFIER(self, t):
+        t.value = intern_name(t.value)
         return t
 
     def error(self, t) -> None:
@@ -89,56 +119,409 @@ class Lexer(BaseLexer):
         raise SyntaxError(f"{constants.error_prefix} illegal character '{t.value[0]}'")
 
 
+class RegexLexer:
+    # Produces the same token stream as Lexer using a single master regex:
+    # keywords are lexed as identifiers and remapped through a dict instead of
+    # being tried one by one with their own \b-anchored patterns
+    keywords: dict[str, str] = {
+        'types': 'TYPES_BLOCK',
+        'functions': 'FUNCTIONS_BLOCK',
+        'hierarchy': 'HIERARCHY_BLOCK',
+        'figure': 'FIGURE_BLOCK',
+        'import': 'IMPORT_KEYWORD',
+        'from': 'FROM_KEYWORD',
+        'as': 'AS_KEYWORD',
+    }
+    punctuation: dict[str, str] = {
+        '{': 'LBRACE',
+        '}': 'RBRACE',
+        ':': 'COLON',
+        ',': 'COMMA',
+        '*': 'ASTERISK',
+        '->': 'ARROW',
+        '(': 'LPAREN',
+        ')': 'RPAREN',
+    }
+
+    master_pattern: re.Pattern = re.compile(
+        r'(?P<IGNORE>[ \t]+|\#.*)'
+        r'|(?P<NEWLINE>\n+)'
+        r'|(?P<IDENTIFIER>[a-zA-Z_][a-zA-Z0-9_]*)'
+        r'|(?P<STRING>\'[^\']*\'|\"[^\"]*\")'
+        r'|(?P<PUNCTUATION>->|[{}:,*()])'
+    )
+    # Keywords only match when they are not followed by another word
+    # character, like \b does for the sly patterns
+    word_character_pattern: re.Pattern = re.compile(r'\w')
+
+    def tokenize(self, text: str, lineno: int = 1, index: int = 0) -> Iterator[Token]:
+        keywords: dict[str, str] = self.keywords
+        punctuation: dict[str, str] = self.punctuation
+        is_word_character = self.word_character_pattern.match
+
+        for match in self.master_pattern.finditer(text, index):
+            start: int = match.start()
+            if start != index:
+                raise SyntaxError(
+                    f"{constants.error_prefix} illegal character '{text[index]}'"
+                )
+            index = match.end()
+
+            kind: Optional[str] = match.lastgroup
+            if kind == 'IGNORE':
+                continue
+
+            value: str = match.group()
+            if kind == 'IDENTIFIER':
+                keyword: Optional[str] = keywords.get(value)
+                if keyword is not None and not is_word_character(text, index):
+                    kind = keyword
+                else:
+                    value = intern_name(value)
+            elif kind == 'STRING':
+                value = intern_string(value[1:-1])
+            elif kind == 'PUNCTUATION':
+                kind = punctuation[value]
+
+            token: Token = Token()
+            token.type = kind
+            token.value = value
+            token.lineno = lineno
+            token.index = start
+            token.end = index
+            yield token
+
+            if kind == 'NEWLINE':
+                lineno += len(value)
+
+        if index < len(text):
+            raise SyntaxError(
+                f"{constants.error_prefix} illegal character '{text[index]}'"
+            )
+
+
+class LRTables:
+    def __init__(
+        self,
+        lr_action: dict[int, dict[str, int]],
+        lr_goto: dict[int, dict[str, int]],
+        defaulted_states: dict[int, int],
+        sr_conflicts: int = 0,
+        rr_conflicts: int = 0,
+    ) -> None:
+        self.lr_action = lr_action
+        self.lr_goto = lr_goto
+        self.defaulted_states = defaulted_states
+        self.sr_conflicts = sr_conflicts
+        self.rr_conflicts = rr_conflicts
+
+
+def _grammar_hash(parser_class: type[BaseParser]) -> str:
+    grammar = parser_class._grammar
+    signature: list[str] = [
+        sly.__version__,
+        ' '.join(sorted(parser_class.tokens)),
+        *(str(production) for production in grammar.Productions),
+    ]
+    return hashlib.sha256('\n'.join(signature).encode('utf-8')).hexdigest()
+
+
+# sly builds the LALR tables from scratch every time the Parser class is
+# created. Only the grammar itself (cheap) is rebuilt here: the tables are
+# loaded from the cache directory when the grammar hash matches.
+def _build_cached_tables(parser_class: type[BaseParser], definitions) -> None:
+    rules = [
+        (name, value)
+        for name, value in definitions
+        if callable(value) and hasattr(value, 'rules')
+    ]
+    if not parser_class._Parser__validate_specification():
+        raise YaccError('Invalid parser specification')
+    parser_class._Parser__build_grammar(rules)
+
+    tables_path: str = os.path.join(
+        get_cache_dir(), f'parsetab-{_grammar_hash(parser_class)}.pickle'
+    )
+    cached_tables: Optional[dict[str, Any]] = load_pickle(tables_path)
+
+    if isinstance(cached_tables, dict):
+        tables: LRTables = LRTables(**cached_tables)
+        parser_class._lrtable = tables
+        if tables.sr_conflicts and tables.sr_conflicts != getattr(
+            parser_class, 'expected_shift_reduce', None
+        ):
+            parser_class.log.warning('%d shift/reduce conflicts', tables.sr_conflicts)
+        if tables.rr_conflicts and tables.rr_conflicts != getattr(
+            parser_class, 'expected_reduce_reduce', None
+        ):
+            parser_class.log.warning('%d reduce/reduce conflicts', tables.rr_conflicts)
+        return
+
+    if not parser_class._Parser__build_lrtables():
+        raise YaccError("Can't build parsing tables")
+
+    lrtable = parser_class._lrtable
+    dump_pickle(
+        tables_path,
+        {
+            'lr_action': lrtable.lr_action,
+            'lr_goto': lrtable.lr_goto,
+            'defaulted_states': lrtable.defaulted_states,
+            'sr_conflicts': len(lrtable.sr_conflicts),
+            'rr_conflicts': len(lrtable.rr_conflicts),
+        },
+    )
+
+
+def _parse_import_in_worker(
+    file_path: str,
+    file_content: str,
+    contents: dict[str, str],
+    imports: list[bytes],
+    lexer_class: type,
+    engine: Literal['lalr', 'descent'],
+) -> bytes:
+    # Runs in a worker process of Parser._parse_imports_in_parallel. Results
+    # travel pickled, so the main process only unpickles the ones it merges.
+    parser: Parser = Parser(lexer_class, engine)
+    for payload in imports:
+        parser.import_cache.put(pickle.loads(payload))
+    parser.fetcher.contents = dict(contents)
+
+    ontology, warnings = parser._parse_source(file_content, file_path)
+    parsed_ontology: ParsedOntology = ParsedOntology(
+        get_source_key(file_path, file_content), ontology, warnings
+    )
+    return pickle.dumps(
+        parsed_ontology.without_imported_ontologies(), pickle.HIGHEST_PROTOCOL
+    )
+
+
 class Parser(BaseParser):
     tokens = Lexer.tokens
     expected_shift_reduce: int = 26
 
-    def __init__(self) -> None:
+    @classmethod
+    def _build(cls, definitions) -> None:
+        _build_cached_tables(cls, definitions)
+
+    def __init__(
+        self,
+        lexer_class: type[Lexer] | type[RegexLexer] = Lexer,
+        engine: Literal['lalr', 'descent'] = 'lalr',
+        import_cache: Optional[ImportCache] = None,
+        ontology_cache: Optional[OntologyCache] = None,
+        fetcher: Optional[SourceFetcher] = None,
+        jobs: int = 1,
+        interner: Optional[Interner] = None,
+    ) -> None:
+        if engine not in ('lalr', 'descent'):
+            raise ValueError(
+                f"{constants.error_prefix} unexpected parser engine '{engine}'. One of the following was expected: lalr, descent"
+            )
+        self.lexer_class: type[Lexer] | type[RegexLexer] = lexer_class
+        self.engine: Literal['lalr', 'descent'] = engine
+        self.import_cache: ImportCache = (
+            import_cache if import_cache is not None else ImportCache()
+        )
+        self.ontology_cache: Optional[OntologyCache] = ontology_cache
+        self.fetcher: SourceFetcher = (
+            fetcher if fetcher is not None else SourceFetcher()
+        )
+        self.jobs: int = jobs
+        self.interner: Interner = interner if interner is not None else Interner()
         self.__ontology: Ontology = Ontology()
-        self.__warnings: list[str] = []
+        self.__warnings: list[Diagnostic | ParsedOntology] = []
+        self.__default_date: bool = False
+
+    def parse(
+        self, file_content: str, file_path: str
+    ) -> tuple[Ontology, list[Diagnostic]]:
+        # Warnings are Diagnostic objects rather than strings: they are only
+        # rendered by str(), so callers display them with map(str, warnings)
+        if self.ontology_cache is not None:
+            cached = self.ontology_cache.load(file_content, file_path)
+            if cached is not None:
+                ontology, warnings, default_date = cached
+                if default_date:
+                    ontology.meta.date = datetime.today().strftime('%Y-%m-%d')
+                return ontology, warnings
+
+        # All the state of a parse lives in a context parser sharing this
+        # parser's caches, so one Parser can serve concurrent parse() calls
+        context: Parser = self._create_context(self.fetcher.fork())
+        graph: ImportGraph = context.fetcher.prefetch(
+            file_content, file_path, self.lexer_class
+        )
+        try:
+            context._check_import_cycle(graph)
+            if self.jobs > 1 and len(graph.imports) > 2:
+                context._parse_imports_in_parallel(graph)
+            ontology, items = context._parse_source(file_content, file_path)
+        finally:
+            context.fetcher.clear()
+        warnings: list[Diagnostic] = flatten_warnings(items)
+
+        if self.ontology_cache is not None:
+            self.ontology_cache.store(
+                file_content,
+                file_path,
+                ontology,
+                warnings,
+                get_import_keys(items),
+                context.__default_date,
+            )
+        return ontology, warnings
+
+    def _create_context(self, fetcher: SourceFetcher) -> 'Parser':
+        return Parser(
+            self.lexer_class,
+            self.engine,
+            self.import_cache,
+            fetcher=fetcher,
+            jobs=self.jobs,
+            interner=self.interner,
+        )
 
-    def parse(self, file_content: str, file_path: str) -> tuple[Ontology, list[str]]:
-        self.__warnings.clear()
+    def _check_import_cycle(self, graph: ImportGraph) -> None:
+        cycle: Optional[list[tuple[str, Any]]] = graph.find_cycle()
+        if cycle is None:
+            return
+
+        chain: str = ' -> '.join(graph.paths[source] for source, _ in cycle)
+        source, token = cycle[-1]
+        diagnostic: Diagnostic = Diagnostic(
+            graph.paths[source],
+            SourceLines(self.fetcher.contents[source]),
+            token.lineno,
+            token.index,
+            f'Import cycle: {chain} -> {graph.paths[cycle[0][0]]}',
+            'error',
+        )
+        raise ValueError(str(diagnostic))
+
+    def _parse_imports_in_parallel(self, graph: ImportGraph) -> None:
+        # Imported files are parsed in worker processes as soon as everything
+        # they import has been parsed. The files imported by the root end up
+        # in the import cache, so the parse of the root file only merges them.
+        # Files that fail to parse are left to the root parse, which reports
+        # the error.
+        remaining: dict[str, set[str]] = {}
+        dependents: dict[str, list[str]] = {}
+        for source, imports in graph.imports.items():
+            if source == graph.root:
+                continue
+            remaining[source] = {target for target, _ in imports}
+            for target in remaining[source]:
+                dependents.setdefault(target, []).append(source)
+
+        payloads: dict[str, bytes] = {}
+        with ProcessPoolExecutor(self.jobs) as executor:
+            pending: dict[Future, str] = {}
+
+            def complete(source: str, payload: bytes) -> None:
+                payloads[source] = payload
+                for dependent in dependents.get(source, []):
+                    remaining[dependent].discard(source)
+                    if not remaining[dependent]:
+                        submit(dependent)
+
+            def submit(source: str) -> None:
+                content: str = self.fetcher.contents[source]
+                cached: Optional[ParsedOntology] = self.import_cache.get(
+                    get_source_key(source, content), self._is_current
+                )
+                if cached is not None:
+                    complete(
+                        source,
+                        pickle.dumps(
+                            cached.without_imported_ontologies(),
+                            pickle.HIGHEST_PROTOCOL,
+                        ),
+                    )
+                    return
+
+                future: Future = executor.submit(
+                    _parse_import_in_worker,
+                    graph.paths[source],
+                    content,
+                    {
+                        target: self.fetcher.contents[target]
+                        for target, _ in graph.imports[source]
+                    },
+                    [payloads[target] for target, _ in graph.imports[source]],
+                    self.lexer_class,
+                    self.engine,
+                )
+                pending[future] = source
+
+            for source in [source for source, deps in remaining.items() if not deps]:
+                submit(source)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source: str = pending.pop(future)
+                    try:
+                        payload: bytes = future.result()
+                    except Exception:
+                        continue
+                    complete(source, payload)
+
+        for target, _ in graph.imports[graph.root]:
+            if target in payloads:
+                self.import_cache.put(pickle.loads(payloads[target]))
+
+    def _parse_source(
+        self, file_content: str, file_path: str
+    ) -> tuple[Ontology, list[Diagnostic | ParsedOntology]]:
+        self.__warnings = []
+        self.__default_date = False
 
         # FIX: fix EOF issue
         file_content += '\n'
 
-        self.__lines: list[str] = file_content.splitlines()
+        self.__source: Optional[SourceLines] = SourceLines(file_content)
         self.__file_path: str = file_path
         self.__ontology: Ontology = Ontology()
 
-        lexer: Lexer = Lexer()
-        tokens: list = lexer.tokenize(file_content)
+        lexer: Lexer | RegexLexer = self.lexer_class()
+        tokens: Iterator[Token] = lexer.tokenize(file_content)
 
-        super().parse(tokens)
+        try:
+            if self.engine == 'descent':
+                DescentParser(self, tokens).parse()
+            else:
+                super().parse(tokens)
+        finally:
+            # Diagnostics keep their own reference to the source, and sly
+            # records the position of every reduced value without ever
+            # dropping them, so neither is kept between parses
+            self.__source = None
+            self._line_positions = {}
+            self._index_positions = {}
 
         return self.__ontology, self.__warnings
 
-    def _get_exception_message(
+    def _get_diagnostic(
         self, token, message: str, type: Literal['warning', 'error'] = 'warning'
-    ) -> str:
-        line_number = token.lineno
-        line: str = self.__lines[line_number - 1]
-        line_padding: int = 4
-        message_prefix: str = (
-            constants.warning_prefix if type == 'warning' else constants.error_prefix
+    ) -> Diagnostic:
+        return Diagnostic(
+            self.__file_path,
+            self.__source,
+            token.lineno,
+            token.index if token is not None else None,
+            message,
+            type,
         )
 
-        final_message: str = f'File "{self.__file_path}", line {line_number}'
-        final_message += f'\n{" " * line_padding}{line}'
-        if token is not None:
-            line_start_index: int = sum(
-                len(line) + 1 for line in self.__lines[: line_number - 1]
-            )
-            column_index: int = token.index - line_start_index
-            final_message += f'\n{" " * line_padding}{" " * column_index}^'
-        final_message += f'\n{message_prefix} {message[0].lower() + message[1:]}'
-
-        return final_message
+    def _get_exception_message(
+        self, token, message: str, type: Literal['warning', 'error'] = 'warning'
+    ) -> str:
+        return str(self._get_diagnostic(token, message, type))
 
     def _add_warning(self, token, message: str) -> None:
-        final_message: str = self._get_exception_message(token, message, 'warning')
-        self.__warnings.append(final_message)
+        self.__warnings.append(self._get_diagnostic(token, message, 'warning'))
 
     def _tokenized_attributes_to_dict(
         self,
@@ -165,12 +548,16 @@ class Parser(BaseParser):
 
         return attributes
 
-    @_('statement_list')
-    def program(self, p) -> Ontology:
+    def _complete_ontology(self) -> Ontology:
         if not self.__ontology.meta.date:
+            self.__default_date = True
             self.__ontology.meta.date = datetime.today().strftime('%Y-%m-%d')
         return self.__ontology
 
+    @_('statement_list')
+    def program(self, p) -> Ontology:
+        return self._complete_ontology()
+
     @_('statement_list statement', '')
     def statement_list(self, p) -> None:
         pass
@@ -179,23 +566,26 @@ class Parser(BaseParser):
     def statement_list(self, p) -> None:
         pass
 
-    @_('IDENTIFIER COLON STRING NEWLINE')
-    def statement(self, p) -> None:
+    def _set_meta(self, tag_token, colon_token, value_token) -> None:
         allowed_meta_tags = [field.name for field in fields(Meta)]
 
-        if p.IDENTIFIER not in allowed_meta_tags:
+        if tag_token.value not in allowed_meta_tags:
             raise ValueError(
                 self._get_exception_message(
-                    p._slice[0],
+                    tag_token,
                     f'Unexpected meta tag. One of the following was expected: {", ".join(allowed_meta_tags)}',
                     'error',
                 )
             )
 
-        if not p.STRING:
-            self._add_warning(p._slice[1], 'Version value is empty')
+        if not value_token.value:
+            self._add_warning(colon_token, 'Version value is empty')
 
-        setattr(self.__ontology.meta, p.IDENTIFIER, p.STRING)
+        setattr(self.__ontology.meta, tag_token.value, value_token.value)
+
+    @_('IDENTIFIER COLON STRING NEWLINE')
+    def statement(self, p) -> None:
+        self._set_meta(p._slice[0], p._slice[1], p._slice[2])
 
     @_('IDENTIFIER')
     def import_identifier(self, p) -> tuple:
@@ -210,7 +600,8 @@ class Parser(BaseParser):
         'import_identifiers_list COMMA NEWLINE import_identifier',
     )
     def import_identifiers_list(self, p) -> list:
-        return p.import_identifiers_list + [p.import_identifier]
+        p.import_identifiers_list.append(p.import_identifier)
+        return p.import_identifiers_list
 
     @_('import_identifier')
     def import_identifiers_list(self, p) -> list:
@@ -258,22 +649,13 @@ class Parser(BaseParser):
         elif isinstance(definition, Relationship):
             self.__ontology.add_relationship(definition)
 
-    def _import_ontology(
-        self,
-        src_token,
-        import_tokens: Optional[list[tuple[Any, Any]]] = None,
-        asterisk_token=None,
-    ) -> None:
+    def _read_import(self, src_token) -> tuple[str, str]:
         content: str = ''
         file_path = src_token.value
 
         if self._validate_src(file_path):
             try:
-                response = requests.get(file_path)
-                if isinstance(response.content, bytes):
-                    content = response.content.decode('utf-8')
-                else:
-                    content = response.text
+                content = self.fetcher.read(file_path)
             except Exception as error:
                 raise ValueError(
                     self._get_exception_message(
@@ -283,12 +665,9 @@ class Parser(BaseParser):
                     )
                 )
         else:
-            if not os.path.isabs(file_path):
-                base_dir = os.path.dirname(self.__file_path)
-                file_path = os.path.join(base_dir, file_path)
+            file_path = resolve_source(file_path, self.__file_path)
             try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
+                content = self.fetcher.read(file_path)
             except FileNotFoundError:
                 raise ValueError(
                     self._get_exception_message(
@@ -314,10 +693,113 @@ class Parser(BaseParser):
                     )
                 )
 
-        parser: Parser = Parser()
-        ontology, warnings = parser.parse(content, file_path)
-        self.__warnings.extend(warnings)
+        return file_path, content
+
+    @staticmethod
+    def _with_aliases(
+        definition: Term | Function | Relationship,
+        alias: Optional[str],
+        aliased_terms: dict[int, Term],
+    ) -> Term | Function | Relationship:
+        # Imported ontologies may be shared through the import cache, so
+        # aliased definitions (and the definitions referencing aliased terms)
+        # are copied instead of being renamed in place
+        if isinstance(definition, Term):
+            return aliased_terms.get(id(definition), definition)
+
+        if isinstance(definition, Function):
+            terms: list[Term] = [arg.term for arg in definition.input_types]
+            terms.append(definition.output_type.term)
+        else:
+            terms = [definition.parent, *definition.children]
+
+        if alias is None and not any(id(term) in aliased_terms for term in terms):
+            return definition
+
+        changes: dict[str, Any] = {}
+        if alias is not None:
+            changes['name'] = alias
+        if isinstance(definition, Function):
+            changes['input_types'] = [
+                FunctionArgument(aliased_terms.get(id(arg.term), arg.term), arg.label)
+                for arg in definition.input_types
+            ]
+            changes['output_type'] = FunctionArgument(
+                aliased_terms.get(
+                    id(definition.output_type.term), definition.output_type.term
+                ),
+                definition.output_type.label,
+            )
+        else:
+            changes['parent'] = aliased_terms.get(
+                id(definition.parent), definition.parent
+            )
+            changes['children'] = [
+                aliased_terms.get(id(child), child) for child in definition.children
+            ]
+        return replace(definition, **changes)
+
+    def _is_current(self, parsed: ParsedOntology) -> bool:
+        # None of the files imported by a cached import changed since
+        return self.fetcher.has_contents(get_import_keys(parsed.warnings))
+
+    def _parse_import(
+        self, key: tuple[str, ...], file_path: str, file_content: str
+    ) -> ParsedOntology:
+        parser: Parser = self._create_context(self.fetcher)
+        ontology, warnings = parser._parse_source(file_content, file_path)
+        parsed: ParsedOntology = ParsedOntology(key, ontology, warnings)
+        self.import_cache.put(parsed)
+        return parsed
+
+    def _parse_selected_import(
+        self,
+        key: tuple[str, ...],
+        file_path: str,
+        file_content: str,
+        names: list[str],
+    ) -> Optional[ParsedOntology]:
+        # Parses only the requested definitions and the terms they reference.
+        # None if the file can not be indexed, e.g. because it has imports.
+        selected_key: tuple[str, ...] = (*key, ','.join(sorted(set(names))))
+        parsed: Optional[ParsedOntology] = self.import_cache.get(
+            selected_key, self._is_current
+        )
+        if parsed is not None:
+            return parsed
+
+        index: Optional[DefinitionIndex] = DefinitionIndex.from_tokens(
+            self.lexer_class().tokenize(file_content), len(file_content)
+        )
+        if index is None:
+            return None
+
+        masked_content: str = index.mask(file_content, names)
+        return self._parse_import(selected_key, file_path, masked_content)
 
+    def _import_ontology(
+        self,
+        src_token,
+        import_tokens: Optional[list[tuple[Any, Any]]] = None,
+        asterisk_token=None,
+    ) -> None:
+        file_path, content = self._read_import(src_token)
+
+        key: tuple[str, ...] = get_source_key(file_path, content)
+        parsed: Optional[ParsedOntology] = self.import_cache.get(key, self._is_current)
+        if parsed is None and import_tokens is not None:
+            parsed = self._parse_selected_import(
+                key,
+                file_path,
+                content,
+                [name_token.value for name_token, _ in import_tokens],
+            )
+        if parsed is None:
+            parsed = self._parse_import(key, file_path, content)
+        self.__warnings.append(parsed)
+        ontology = parsed.ontology
+
+        aliases: dict[str, str] = {}
         if import_tokens is not None:
             for name_token, alias_token in import_tokens:
                 definition: Optional[Term | Function | Relationship] = (
@@ -331,6 +813,18 @@ class Parser(BaseParser):
                             'error',
                         )
                     )
+                if alias_token is not None:
+                    aliases[name_token.value] = alias_token.value
+
+        aliased_terms: dict[int, Term] = {
+            id(term): replace(term, name=aliases[term.name])
+            for term in ontology.types
+            if term.name in aliases
+        }
+        selected_tokens: dict[str, tuple[Any, Any]] = {}
+        if import_tokens is not None:
+            for name_token, alias_token in import_tokens:
+                selected_tokens.setdefault(name_token.value, (name_token, alias_token))
 
         definitions: list[Term | Function | Relationship] = (
             ontology.types + ontology.functions + ontology.hierarchy
@@ -341,19 +835,17 @@ class Parser(BaseParser):
 
             name_token, alias_token = None, None
             if import_tokens is not None:
-                name_token, alias_token = next(
-                    (
-                        (name_token, alias_token)
-                        for name_token, alias_token in import_tokens
-                        if definition.name == name_token.value
-                    ),
-                    (None, None),
+                name_token, alias_token = selected_tokens.get(
+                    definition.name, (None, None)
                 )
                 if name_token is None:
                     continue
 
-            if alias_token is not None:
-                definition.name = alias_token.value
+            definition = self._with_aliases(
+                definition,
+                alias_token.value if alias_token is not None else None,
+                aliased_terms,
+            )
 
             exception_token: Any = None
             if alias_token is not None:
@@ -407,40 +899,47 @@ class Parser(BaseParser):
     def type_list(self, p) -> None:
         pass
 
-    @_('IDENTIFIER COLON STRING COMMA STRING attributes')
-    def type(self, p) -> None:
+    def _add_type(
+        self, name_token, label_token, description_token, attributes_tokens
+    ) -> None:
         existing_definition: Optional[Term | Function | Relationship] = (
-            self.__ontology.find_definition_by_name(p.IDENTIFIER)
+            self.__ontology.find_definition_by_name(name_token.value)
         )
 
         if existing_definition is not None:
             raise ValueError(
                 self._get_exception_message(
-                    p._slice[0],
-                    f'Definition {p.IDENTIFIER} has already been declared',
+                    name_token,
+                    f'Definition {name_token.value} has already been declared',
                     'error',
                 )
             )
 
         attributes: dict[str, Any] = self._tokenized_attributes_to_dict(
-            p.attributes, TermAttributes
+            attributes_tokens, TermAttributes
         )
 
         term = Term(
-            name=p.IDENTIFIER,
-            label=p.STRING0,
-            description=p.STRING1,
-            attributes=TermAttributes(**attributes),
+            name=name_token.value,
+            label=label_token.value,
+            description=description_token.value,
+            attributes=self.interner.intern_attributes(TermAttributes(**attributes))
+            if attributes
+            else EMPTY_TERM_ATTRIBUTES,
         )
 
-        if not p.STRING0:
-            self._add_warning(p._slice[2], 'Term label is empty')
+        if not label_token.value:
+            self._add_warning(label_token, 'Term label is empty')
 
-        if not p.STRING1:
-            self._add_warning(p._slice[4], 'Term description is empty')
+        if not description_token.value:
+            self._add_warning(description_token, 'Term description is empty')
 
         self.__ontology.add_type(term)
 
+    @_('IDENTIFIER COLON STRING COMMA STRING attributes')
+    def type(self, p) -> None:
+        self._add_type(p._slice[0], p._slice[2], p._slice[4], p.attributes)
+
     @_('FUNCTIONS_BLOCK COLON NEWLINE function_list')
     def statement(self, p) -> None:
         pass
@@ -476,68 +975,83 @@ class Parser(BaseParser):
 
         return attributes
 
-    @_('IDENTIFIER COLON STRING params ARROW IDENTIFIER COLON STRING attributes')
-    def function(self, p) -> None:
+    def _add_function(
+        self,
+        name_token,
+        label_token,
+        input_types: list[FunctionArgument],
+        output_term_token,
+        output_label_token,
+        attributes_tokens,
+    ) -> None:
         existing_definition: Optional[Term | Function | Relationship] = (
-            self.__ontology.find_definition_by_name(p.IDENTIFIER0)
+            self.__ontology.find_definition_by_name(name_token.value)
         )
 
         if existing_definition is not None:
             raise ValueError(
                 self._get_exception_message(
-                    p._slice[0],
-                    f'Definition {p.IDENTIFIER0} has already been declared',
+                    name_token,
+                    f'Definition {name_token.value} has already been declared',
                     'error',
                 )
             )
 
-        input_types = p.params
-
-        output_term: Optional[Term] = self.__ontology.find_term_by_name(p.IDENTIFIER1)
+        output_term: Optional[Term] = self.__ontology.find_term_by_name(
+            output_term_token.value
+        )
 
         if output_term is None:
             raise ValueError(
                 self._get_exception_message(
-                    p._slice[5], f'Undefined term {p.IDENTIFIER1}', 'error'
+                    output_term_token,
+                    f'Undefined term {output_term_token.value}',
+                    'error',
                 )
             )
 
-        output_type: FunctionArgument = FunctionArgument(output_term, p.STRING1)
+        output_type: FunctionArgument = FunctionArgument(
+            output_term, output_label_token.value
+        )
 
         attributes: dict[str, Any] = self._tokenized_function_attributes_to_dict(
-            p.attributes
+            attributes_tokens
         )
 
         function: Function = Function(
-            name=p.IDENTIFIER0,
-            label=p.STRING0,
+            name=name_token.value,
+            label=label_token.value,
             input_types=input_types,
             output_type=output_type,
-            attributes=FunctionAttributes(**attributes),
+            attributes=self.interner.intern_attributes(FunctionAttributes(**attributes))
+            if attributes
+            else EMPTY_FUNCTION_ATTRIBUTES,
         )
 
-        if not p.STRING0:
-            self._add_warning(p._slice[2], 'Label is empty')
+        if not label_token.value:
+            self._add_warning(label_token, 'Label is empty')
 
-        if not p.STRING1:
-            self._add_warning(p._slice[7], 'Output term label is empty')
+        if not output_label_token.value:
+            self._add_warning(output_label_token, 'Output term label is empty')
 
         self.__ontology.add_function(function)
 
-    @_(
-        'LPAREN param_list RPAREN',
-        'LPAREN NEWLINE param_list RPAREN',
-        'LPAREN param_list NEWLINE RPAREN',
-        'LPAREN NEWLINE param_list NEWLINE RPAREN',
-        'LPAREN NEWLINE param_list COMMA NEWLINE RPAREN',
-    )
-    def params(self, p) -> list[FunctionArgument]:
+    @_('IDENTIFIER COLON STRING params ARROW IDENTIFIER COLON STRING attributes')
+    def function(self, p) -> None:
+        self._add_function(
+            p._slice[0],
+            p._slice[2],
+            p.params,
+            p._slice[5],
+            p._slice[7],
+            p.attributes,
+        )
+
+    def _resolve_params(self, params_tokens: list[tuple]) -> list[FunctionArgument]:
         params: list[FunctionArgument] = []
 
-        for param in p.param_list:
-            term_token = param[0]
+        for term_token, label_token in params_tokens:
             term_name: str = term_token.value
-            label_token = param[1]
             param_label: str = label_token.value
 
             term: Optional[Term] = self.__ontology.find_term_by_name(term_name)
@@ -556,6 +1070,16 @@ class Parser(BaseParser):
 
         return params
 
+    @_(
+        'LPAREN param_list RPAREN',
+        'LPAREN NEWLINE param_list RPAREN',
+        'LPAREN param_list NEWLINE RPAREN',
+        'LPAREN NEWLINE param_list NEWLINE RPAREN',
+        'LPAREN NEWLINE param_list COMMA NEWLINE RPAREN',
+    )
+    def params(self, p) -> list[FunctionArgument]:
+        return self._resolve_params(p.param_list)
+
     @_('')
     def param_list(self, p) -> list[tuple]:
         return []
@@ -569,7 +1093,8 @@ class Parser(BaseParser):
         'param_list COMMA NEWLINE param',
     )
     def param_list(self, p) -> list[tuple]:
-        return p.param_list + [p.param]
+        p.param_list.append(p.param)
+        return p.param_list
 
     @_('IDENTIFIER COLON STRING')
     def param(self, p) -> tuple:
@@ -675,7 +1200,11 @@ class Parser(BaseParser):
             parent=parent,
             relationship=relationship_type,
             children=children,
-            attributes=RelationshipAttributes(**attributes),
+            attributes=self.interner.intern_attributes(
+                RelationshipAttributes(**attributes)
+            )
+            if attributes
+            else EMPTY_RELATIONSHIP_ATTRIBUTES,
         )
         self.__ontology.add_relationship(relationship)
 
@@ -699,11 +1228,10 @@ class Parser(BaseParser):
             p.attributes,
         )
 
-    @_('FIGURE_BLOCK STRING COLON NEWLINE figure_list')
-    def statement(self, p) -> None:
-        figure: Figure = Figure(name=p.STRING)
+    def _add_figure(self, name_token, identifier_tokens: list[Any]) -> None:
+        figure: Figure = Figure(name=name_token.value)
 
-        for token in p.figure_list:
+        for token in identifier_tokens:
             definition: Optional[Term | Function | Relationship] = (
                 self.__ontology.find_definition_by_name(token.value)
             )
@@ -724,9 +1252,14 @@ class Parser(BaseParser):
 
         self.__ontology.add_figure(figure)
 
+    @_('FIGURE_BLOCK STRING COLON NEWLINE figure_list')
+    def statement(self, p) -> None:
+        self._add_figure(p._slice[1], p.figure_list)
+
     @_('figure_list IDENTIFIER NEWLINE')
     def figure_list(self, p) -> list[Any]:
-        return p.figure_list + [p._slice[1]]
+        p.figure_list.append(p._slice[1])
+        return p.figure_list
 
     @_(
         'NEWLINE figure_list',
@@ -757,7 +1290,8 @@ class Parser(BaseParser):
         'attribute_list COMMA NEWLINE attribute',
     )
     def attribute_list(self, p) -> list[tuple[Any, Any]]:
-        return p.attribute_list + [p.attribute]
+        p.attribute_list.append(p.attribute)
+        return p.attribute_list
 
     @_('attribute')
     def attribute_list(self, p) -> list[tuple[Any, Any]]:
@@ -767,12 +1301,15 @@ class Parser(BaseParser):
     def attribute_list(self, p) -> list[tuple[Any, Any]]:
         return []
 
+    def _attribute(self, key_token, value_token) -> tuple[Any, Any]:
+        if not value_token.value:
+            self._add_warning(value_token, 'Attribute value is empty')
+
+        return (key_token, value_token)
+
     @_('IDENTIFIER COLON STRING')
     def attribute(self, p) -> tuple[Any, Any]:
-        if not p.STRING:
-            self._add_warning(p._slice[2], 'Attribute value is empty')
-
-        return (p._slice[0], p._slice[2])
+        return self._attribute(p._slice[0], p._slice[2])
 
     @_('NEWLINE')
     def statement(self, p) -> None:
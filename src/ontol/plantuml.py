@@ -1,8 +1,7 @@
 import collections
 import os
-import zlib
-import requests
-from typing import Optional
+import re
+from typing import Iterator, Optional, TextIO
 
 from ontol import (
     Function,
@@ -14,52 +13,230 @@ from ontol import (
     RelationshipAttributes,
     TermAttributes,
 )
+from ontol.cache import RenderCache, remove_file
+from ontol.renderers import SERVER_URL, HTTPRenderer, Renderer
+
+ARROW_STYLES: dict[RelationshipType, dict[RelationshipDirection, str]] = {
+    RelationshipType.DEPENDENCE: {
+        RelationshipDirection.FORWARD: '...>',
+        RelationshipDirection.BACKWARD: '<...',
+        RelationshipDirection.BIDIRECTIONAL: '<...>',
+    },
+    RelationshipType.ASSOCIATION: {
+        RelationshipDirection.FORWARD: '---',
+        RelationshipDirection.BACKWARD: '---',
+        RelationshipDirection.BIDIRECTIONAL: '---',
+    },
+    RelationshipType.DIRECT_ASSOCIATION: {
+        RelationshipDirection.FORWARD: '--->',
+        RelationshipDirection.BACKWARD: '<---',
+        RelationshipDirection.BIDIRECTIONAL: '<--->',
+    },
+    RelationshipType.INHERITANCE: {
+        RelationshipDirection.FORWARD: '---|>',
+        RelationshipDirection.BACKWARD: '<|---',
+        RelationshipDirection.BIDIRECTIONAL: '<|---|>',
+    },
+    RelationshipType.IMPLEMENTATION: {
+        RelationshipDirection.FORWARD: '...|>',
+        RelationshipDirection.BACKWARD: '<|...',
+        RelationshipDirection.BIDIRECTIONAL: '<|...|>',
+    },
+    RelationshipType.AGGREGATION: {
+        RelationshipDirection.FORWARD: '---o',
+        RelationshipDirection.BACKWARD: 'o---',
+        RelationshipDirection.BIDIRECTIONAL: 'o---o',
+    },
+    RelationshipType.COMPOSITION: {
+        RelationshipDirection.FORWARD: '---*',
+        RelationshipDirection.BACKWARD: '*---',
+        RelationshipDirection.BIDIRECTIONAL: '*---*',
+    },
+}
+# Arrows split where the color goes: after the head of bidirectional arrows
+# (e.g. '<..' + '[#black]' + '.>'), after two characters otherwise
+ARROWS: dict[tuple[RelationshipType, RelationshipDirection], tuple[str, str]] = {
+    (relationship_type, direction): (
+        arrow[: 3 if direction == RelationshipDirection.BIDIRECTIONAL else 2],
+        arrow[3 if direction == RelationshipDirection.BIDIRECTIONAL else 2 :],
+    )
+    for relationship_type, arrows in ARROW_STYLES.items()
+    for direction, arrow in arrows.items()
+}
+
+
+# The same arrows in Graphviz: the line style and the shape drawn at the child
+# end of forward arrows, at the parent end of backward ones and at both ends of
+# bidirectional ones
+DOT_ARROW_STYLES: dict[RelationshipType, tuple[str, str]] = {
+    RelationshipType.DEPENDENCE: ('dashed', 'vee'),
+    RelationshipType.ASSOCIATION: ('solid', 'none'),
+    RelationshipType.DIRECT_ASSOCIATION: ('solid', 'vee'),
+    RelationshipType.INHERITANCE: ('solid', 'empty'),
+    RelationshipType.IMPLEMENTATION: ('dashed', 'empty'),
+    RelationshipType.AGGREGATION: ('solid', 'odiamond'),
+    RelationshipType.COMPOSITION: ('solid', 'diamond'),
+}
+DOT_DIRECTIONS: dict[RelationshipDirection, str] = {
+    RelationshipDirection.FORWARD: 'forward',
+    RelationshipDirection.BACKWARD: 'back',
+    RelationshipDirection.BIDIRECTIONAL: 'both',
+}
+DOT_ARROWS: dict[tuple[RelationshipType, RelationshipDirection], str] = {
+    (relationship_type, direction): (
+        f'style={style}, '
+        f'dir={"none" if shape == "none" else DOT_DIRECTIONS[direction]}, '
+        f'arrowhead={shape}, arrowtail={shape}'
+    )
+    for relationship_type, (style, shape) in DOT_ARROW_STYLES.items()
+    for direction in RelationshipDirection
+}
+HEX_COLOR: re.Pattern = re.compile(r'#(?:[0-9A-Fa-f]{6}|[0-9A-Fa-f]{8})')
+
+
+def quote_dot(text: str) -> str:
+    # Backslashes are left alone, so escapes such as \n still break lines
+    return '"' + text.replace('"', '\\"').replace('\n', '\\n') + '"'
+
+
+def dot_color(color: str) -> str:
+    # PlantUML writes color names with a '#' (#white), Graphviz without it
+    if color.startswith('#') and not HEX_COLOR.fullmatch(color):
+        return color[1:]
+    return color
+
+
+def prepare_function_term(function: Function) -> Term:
+    # The box of a function: its label and signature
+    input_str: list[str] = [
+        f'{el.term.name}: {el.label}' if el.label else str(el.term.name)
+        for el in function.input_types
+    ]
+    output_str: str = (
+        f'{function.output_type.term.name}: {function.output_type.label}'
+        if function.output_type.label
+        else str(function.output_type.term.name)
+    )
+    description: str = f'{", ".join(input_str)} -> {output_str}'
+    return Term(
+        function.name,
+        function.label,
+        description,
+        TermAttributes(color=function.attributes.color or '#white'),
+    )
+
+
+def prepare_function_hierarchy(
+    function: Function, terms: dict[str, Term]
+) -> list[Relationship]:
+    # Arrows from the input terms of a function to its box and from the box to
+    # its output term
+    relations = []
+    input_types: collections.defaultdict[str, int] = collections.defaultdict(int)
+    for input_type in function.input_types:
+        input_types[input_type.term.name] += 1
+    for k, v in input_types.items():
+        term: Optional[Term] = terms.get(k)
+        if term is None:
+            continue
+        relations.append(
+            Relationship(
+                parent=term,
+                relationship=RelationshipType.from_str(function.attributes.type.value)
+                if function.attributes.type
+                else RelationshipType.DIRECT_ASSOCIATION,
+                children=[Term(function.name)],
+                attributes=RelationshipAttributes(
+                    color=function.attributes.colorArrow or '#black',
+                    title=function.attributes.inputTitle or '',
+                    leftChar=f'{v if v != 1 else ""}',
+                    direction=RelationshipDirection.FORWARD,
+                ),
+            )
+        )
+    relations.append(
+        Relationship(
+            parent=Term(function.name),
+            relationship=RelationshipType.from_str(function.attributes.type.value)
+            if function.attributes.type
+            else RelationshipType.DIRECT_ASSOCIATION,
+            children=[terms.get(function.output_type.term.name)],
+            attributes=RelationshipAttributes(
+                color=function.attributes.colorArrow,
+                title=function.attributes.outputTitle or '',
+                direction=RelationshipDirection.FORWARD,
+            ),
+        )
+    )
+    return relations
 
 
 # TODO: make look like in technical task
 class PlantUML:
-    SERVER_URL: str = 'http://www.plantuml.com/plantuml/png/'
+    SERVER_URL: str = SERVER_URL
 
-    def __init__(self, url=SERVER_URL):
+    def __init__(
+        self,
+        url=SERVER_URL,
+        renderer: Optional[Renderer] = None,
+        render_cache: Optional[RenderCache] = None,
+    ):
         self.url = url
+        self.renderer: Renderer = (
+            renderer if renderer is not None else HTTPRenderer(url)
+        )
+        self.render_cache: Optional[RenderCache] = render_cache
 
     def generate(self, ontology: Ontology) -> str:
         return self._generate_base(ontology)
 
+    def write(self, ontology: Ontology, file: TextIO) -> None:
+        # Streams the same text as generate() to a file (or a socket's
+        # makefile()) without building it in memory
+        lines: Iterator[str] = self.iter_lines(ontology)
+        file.write(next(lines))
+        for line in lines:
+            file.write('\n')
+            file.write(line)
+
     def _generate_base(self, ontology: Ontology) -> str:
-        uml_lines: list[str] = [
-            '@startuml',
-            'skinparam backgroundColor #F0F8FF',
-            'skinparam defaultTextAlignment center',
-            'skinparam shadowing false',
-            'skinparam dpi 150',
-            'skinparam linetype ortho',
-            'skinparam ranksep 40',
-            'skinparam nodesep 30',
+        return '\n'.join(self.iter_lines(ontology))
+
+    def iter_lines(self, ontology: Ontology) -> Iterator[str]:
+        yield '@startuml'
+        yield 'skinparam backgroundColor #F0F8FF'
+        yield 'skinparam defaultTextAlignment center'
+        yield 'skinparam shadowing false'
+        yield 'skinparam dpi 150'
+        yield 'skinparam linetype ortho'
+        yield 'skinparam ranksep 40'
+        yield 'skinparam nodesep 30'
+        yield (
             f'package "'
             f'{ontology.meta.title if ontology.meta.title is not None else "Онтология"}'
-            f'" {{',
-        ]
+            f'" {{'
+        )
 
         for term in ontology.types:
-            uml_lines.append(self._generate_rectangle(term))
-            uml_lines.append(self._generate_note(term))
+            yield self._generate_rectangle(term)
+            yield self._generate_note(term)
 
         for function in ontology.functions:
-            uml_lines.append(
-                self._generate_rectangle(self.__prepare_function_term(function))
-            )
+            yield self._generate_rectangle(prepare_function_term(function))
 
+        # The first term with a name wins, like in Ontology.find_term_by_name
+        terms: dict[str, Term] = {}
+        for term in ontology.types:
+            terms.setdefault(term.name, term)
         for function in ontology.functions:
-            for relations in self.__prepare_function_hierarchy(function, ontology):
-                uml_lines.append(self._generate_base_hierarchy(relations))
+            for relations in prepare_function_hierarchy(function, terms):
+                yield self._generate_base_hierarchy(relations)
 
         for relationship in ontology.hierarchy:
-            uml_lines.append(self._generate_base_hierarchy(relationship))
+            yield self._generate_base_hierarchy(relationship)
 
-        uml_lines.append('}')
-        uml_lines.append('@enduml')
-        return '\n'.join(uml_lines)
+        yield '}'
+        yield '@enduml'
 
     @staticmethod
     def _generate_rectangle(term: Term) -> str:
@@ -79,43 +256,6 @@ class PlantUML:
 
     @staticmethod
     def _generate_base_hierarchy(relationship: Relationship) -> str:
-        relationships = {
-            RelationshipType.DEPENDENCE.value: {
-                RelationshipDirection.FORWARD.value: '...>',
-                RelationshipDirection.BACKWARD.value: '<...',
-                RelationshipDirection.BIDIRECTIONAL.value: '<...>',
-            },
-            RelationshipType.ASSOCIATION.value: {
-                RelationshipDirection.FORWARD.value: '---',
-                RelationshipDirection.BACKWARD.value: '---',
-                RelationshipDirection.BIDIRECTIONAL.value: '---',
-            },
-            RelationshipType.DIRECT_ASSOCIATION.value: {
-                RelationshipDirection.FORWARD.value: '--->',
-                RelationshipDirection.BACKWARD.value: '<---',
-                RelationshipDirection.BIDIRECTIONAL.value: '<--->',
-            },
-            RelationshipType.INHERITANCE.value: {
-                RelationshipDirection.FORWARD.value: '---|>',
-                RelationshipDirection.BACKWARD.value: '<|---',
-                RelationshipDirection.BIDIRECTIONAL.value: '<|---|>',
-            },
-            RelationshipType.IMPLEMENTATION.value: {
-                RelationshipDirection.FORWARD.value: '...|>',
-                RelationshipDirection.BACKWARD.value: '<|...',
-                RelationshipDirection.BIDIRECTIONAL.value: '<|...|>',
-            },
-            RelationshipType.AGGREGATION.value: {
-                RelationshipDirection.FORWARD.value: '---o',
-                RelationshipDirection.BACKWARD.value: 'o---',
-                RelationshipDirection.BIDIRECTIONAL.value: 'o---o',
-            },
-            RelationshipType.COMPOSITION.value: {
-                RelationshipDirection.FORWARD.value: '---*',
-                RelationshipDirection.BACKWARD.value: '*---',
-                RelationshipDirection.BIDIRECTIONAL.value: '*---*',
-            },
-        }
         leftchar: str = (
             ('"' + relationship.attributes.leftChar + '"')
             if relationship.attributes.leftChar
@@ -132,95 +272,17 @@ class PlantUML:
             else ''
         )
         color: str = '[' + (relationship.attributes.color or '#black') + ']'
-        slice = (
-            3
-            if relationship.attributes.direction == RelationshipDirection.BIDIRECTIONAL
-            else 2
-        )
+        head, tail = ARROWS[
+            relationship.relationship,
+            relationship.attributes.direction or RelationshipDirection.FORWARD,
+        ]
 
-        relation: str = (
-            relationships[relationship.relationship.value][
-                relationship.attributes.direction.value
-                if relationship.attributes.direction
-                else RelationshipDirection.FORWARD.value
-            ][:slice]
-            + color
-            + relationships[relationship.relationship.value][
-                relationship.attributes.direction.value
-                if relationship.attributes.direction
-                else RelationshipDirection.FORWARD.value
-            ][slice:]
-        )
-        res: str = ''
-        res += (
+        return (
             f'{relationship.parent.name} {leftchar} '
-            f'{relation} '
+            f'{head}{color}{tail} '
             f'{rightchar} '
-            f'{relationship.children[0].name} {title}'
-        ) + '\n'
-        return res
-
-    @staticmethod
-    def __prepare_function_term(function: Function):
-        input_str: list[str] = [
-            f'{el.term.name}: {el.label}' if el.label else str(el.term.name)
-            for el in function.input_types
-        ]
-        output_str: str = (
-            f'{function.output_type.term.name}: {function.output_type.label}'
-            if function.output_type.label
-            else str(function.output_type.term.name)
-        )
-        description: str = f'{", ".join(input_str)} -> {output_str}'
-        return Term(
-            function.name,
-            function.label,
-            description,
-            TermAttributes(color=function.attributes.color or '#white'),
-        )
-
-    @staticmethod
-    def __prepare_function_hierarchy(function: Function, ontology: Ontology):
-        relations = []
-        input_types: collections.defaultdict[str, int] = collections.defaultdict(int)
-        for input_type in function.input_types:
-            input_types[input_type.term.name] += 1
-        for k, v in input_types.items():
-            term: Optional[Term] = ontology.find_term_by_name(k)
-            if term is None:
-                continue
-            relations.append(
-                Relationship(
-                    parent=term,
-                    relationship=RelationshipType.from_str(
-                        function.attributes.type.value
-                    )
-                    if function.attributes.type
-                    else RelationshipType.DIRECT_ASSOCIATION,
-                    children=[Term(function.name)],
-                    attributes=RelationshipAttributes(
-                        color=function.attributes.colorArrow or '#black',
-                        title=function.attributes.inputTitle or '',
-                        leftChar=f'{v if v != 1 else ""}',
-                        direction=RelationshipDirection.FORWARD,
-                    ),
-                )
-            )
-        relations.append(
-            Relationship(
-                parent=Term(function.name),
-                relationship=RelationshipType.from_str(function.attributes.type.value)
-                if function.attributes.type
-                else RelationshipType.DIRECT_ASSOCIATION,
-                children=[ontology.find_term_by_name(function.output_type.term.name)],
-                attributes=RelationshipAttributes(
-                    color=function.attributes.colorArrow,
-                    title=function.attributes.outputTitle or '',
-                    direction=RelationshipDirection.FORWARD,
-                ),
-            )
+            f'{relationship.children[0].name} {title}\n'
         )
-        return relations
 
     def _generate_type(self, term: Term) -> str:
         return f'class {term.name} {{\n  {term.description}\n}}'
@@ -248,29 +310,131 @@ class PlantUML:
         with open(puml_file, 'r', encoding='utf-8') as file:
             plantuml_text = file.read()
 
-        data = zlib.compress(plantuml_text.encode('utf-8'))[2:-4]
-        encoded_text = ''
-        for i in range(0, len(data), 3):
-            if i + 2 == len(data):
-                encoded_text += self.__encode3bytes(data[i], data[i + 1], 0)
-            elif i + 1 == len(data):
-                encoded_text += self.__encode3bytes(data[i], 0, 0)
-            else:
-                encoded_text += self.__encode3bytes(data[i], data[i + 1], data[i + 2])
-
-        url = f'{self.url}{encoded_text}'
-        response = requests.get(url)
-        response.raise_for_status()
-
-        if response.status_code == 200:
+        self.render_png(plantuml_text, outfile)
+
+    def render_png(self, plantuml_text: str, outfile: str) -> None:
+        self.render_pngs([(plantuml_text, outfile)])
+
+    def render_pngs(self, diagrams: list[tuple[str, str]]) -> None:
+        # Cached diagrams are linked to their output paths, the others are
+        # rendered in one batch, which lets the renderer reuse its process or
+        # connections for all of them
+        missing: list[tuple[str, str, Optional[str]]] = []
+        for plantuml_text, outfile in diagrams:
+            key: Optional[str] = None
+            if self.render_cache is not None:
+                key = self.render_cache.get_key(plantuml_text, self.renderer.name)
+                if self.render_cache.link(key, outfile):
+                    continue
+            missing.append((plantuml_text, outfile, key))
+        if not missing:
+            return
+
+        images: list[bytes] = self.renderer.render_batch(
+            [plantuml_text for plantuml_text, _, _ in missing]
+        )
+        for (_, outfile, key), png in zip(missing, images):
+            # The previous output may be linked to a cached image
+            remove_file(outfile)
             with open(outfile, 'wb') as out:
-                out.write(response.content)
+                out.write(png)
+            if key is not None:
+                self.render_cache.store(key, png)
+
+
+class DotGenerator:
+    # The diagram of PlantUML as Graphviz DOT. PlantUML lays its diagrams out
+    # with Graphviz anyway, so rendering this text with the dot binary gives
+    # the same boxes and arrows without the JVM.
+    def generate(self, ontology: Ontology) -> str:
+        return '\n'.join(self.iter_lines(ontology))
+
+    def write(self, ontology: Ontology, file: TextIO) -> None:
+        lines: Iterator[str] = self.iter_lines(ontology)
+        file.write(next(lines))
+        for line in lines:
+            file.write('\n')
+            file.write(line)
+
+    def iter_lines(self, ontology: Ontology) -> Iterator[str]:
+        title: str = (
+            ontology.meta.title if ontology.meta.title is not None else 'Онтология'
+        )
+        yield 'digraph ontology {'
+        # Straight edge segments like PlantUML's ortho line type, but unlike
+        # splines=ortho they keep the label, taillabel and headlabel of edges
+        yield (
+            'graph [bgcolor="#F0F8FF", dpi=150, splines=polyline, '
+            'ranksep=0.55, nodesep=0.4, fontname="Helvetica"]'
+        )
+        yield 'node [shape=box, style=filled, fillcolor=white, fontname="Helvetica"]'
+        yield 'edge [fontname="Helvetica", fontsize=10]'
+        yield 'subgraph cluster_package {'
+        yield f'label={quote_dot(title)}'
+
+        for term in ontology.types:
+            yield self._generate_node(term)
+            if term.attributes.note:
+                yield from self._generate_note(term)
+
+        for function in ontology.functions:
+            yield self._generate_node(prepare_function_term(function))
+
+        terms: dict[str, Term] = {}
+        for term in ontology.types:
+            terms.setdefault(term.name, term)
+        for function in ontology.functions:
+            for relations in prepare_function_hierarchy(function, terms):
+                yield self._generate_edge(relations)
+
+        for relationship in ontology.hierarchy:
+            yield self._generate_edge(relationship)
+
+        yield '}'
+        yield '}'
 
     @staticmethod
-    def __encode3bytes(b1, b2, b3):
-        chars = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_'
-        c1 = b1 >> 2
-        c2 = ((b1 & 0x3) << 4) | (b2 >> 4)
-        c3 = ((b2 & 0xF) << 2) | (b3 >> 6)
-        c4 = b3 & 0x3F
-        return chars[c1] + chars[c2] + chars[c3] + chars[c4]
+    def _generate_node(term: Term) -> str:
+        label: str = f'{term.label}' + (
+            f'\\n({term.description})' if term.description else ''
+        )
+        color: str = dot_color(term.attributes.color or '#white')
+        return (
+            f'{quote_dot(term.name)} '
+            f'[label={quote_dot(label)}, fillcolor={quote_dot(color)}]'
+        )
+
+    @staticmethod
+    def _generate_note(term: Term) -> Iterator[str]:
+        # Notes stay on the right of their term, like PlantUML's note right of
+        note: str = quote_dot(f'note:{term.name}')
+        yield (
+            f'{note} [shape=note, fillcolor="#FBFB77", '
+            f'label={quote_dot(term.attributes.note)}]'
+        )
+        yield f'{quote_dot(term.name)} -> {note} [style=dashed, dir=none]'
+        yield f'{{rank=same; {quote_dot(term.name)}; {note}}}'
+
+    @staticmethod
+    def _generate_edge(relationship: Relationship) -> str:
+        attributes: list[str] = [
+            DOT_ARROWS[
+                relationship.relationship,
+                relationship.attributes.direction or RelationshipDirection.FORWARD,
+            ],
+            f'color={quote_dot(dot_color(relationship.attributes.color or "#black"))}',
+        ]
+        if relationship.attributes.title:
+            attributes.append(f'label={quote_dot(relationship.attributes.title)}')
+        if relationship.attributes.leftChar:
+            attributes.append(
+                f'taillabel={quote_dot(relationship.attributes.leftChar)}'
+            )
+        if relationship.attributes.rightChar:
+            attributes.append(
+                f'headlabel={quote_dot(relationship.attributes.rightChar)}'
+            )
+        return (
+            f'{quote_dot(relationship.parent.name)} -> '
+            f'{quote_dot(relationship.children[0].name)} [{", ".join(attributes)}]'
+        )
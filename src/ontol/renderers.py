@@ -0,0 +1,439 @@
+import base64
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ontol.imports import is_url
+
+SERVER_URL: str = 'http://www.plantuml.com/plantuml/png/'
+
+# PlantUML encodes diagrams in URLs with base64 over its own alphabet
+PLANTUML_ALPHABET: bytes = (
+    b'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_'
+)
+BASE64_ALPHABET: bytes = (
+    b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+)
+# PlantUML pads the last group with zero bits instead of '='
+ENCODE_TABLE: bytes = bytes.maketrans(BASE64_ALPHABET + b'=', PLANTUML_ALPHABET + b'0')
+DECODE_TABLE: bytes = bytes.maketrans(PLANTUML_ALPHABET, BASE64_ALPHABET)
+
+
+def encode_plantuml(plantuml_text: str, compression_level: int = -1) -> str:
+    # Raw deflate, then base64 translated to the PlantUML alphabet
+    compressor = zlib.compressobj(compression_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    data: bytes = compressor.compress(plantuml_text.encode('utf-8'))
+    data += compressor.flush()
+    return base64.b64encode(data).translate(ENCODE_TABLE).decode('ascii')
+
+
+def decode_plantuml(encoded_text: str) -> str:
+    # The zero bits padding the last group decode to extra bytes after the
+    # end of the deflate stream, which the decompressor ignores
+    data: bytes = base64.b64decode(encoded_text.encode('ascii').translate(DECODE_TABLE))
+    return zlib.decompressobj(-zlib.MAX_WBITS).decompress(data).decode('utf-8')
+
+
+def join_diagrams(plantuml_texts: list[str]) -> str:
+    # One document holding every diagram as its own @startuml block. In -pipe
+    # mode PlantUML renders a block as soon as it reads its @enduml line and
+    # writes one image per block, in order.
+    return ''.join(
+        text if text.endswith('\n') else f'{text}\n' for text in plantuml_texts
+    )
+
+
+def find_image(
+    output: bytes | bytearray, delimiter: bytes, start: int = 0
+) -> Optional[tuple[int, int]]:
+    # End of the image at start in -pipedelimitor output and start of the next
+    # one, once the whole delimiter line has been read
+    end: int = output.find(delimiter, start)
+    if end == -1:
+        return None
+    line_end: int = output.find(b'\n', end + len(delimiter))
+    if line_end == -1:
+        return None
+    return end, line_end + 1
+
+
+# Every PNG file ends with an empty IEND chunk, whose CRC is always the same
+PNG_END: bytes = b'IEND\xaeB`\x82'
+
+LOCAL_PREFIX: str = 'local:'
+
+
+class Renderer:
+    # Turns diagram text into PNG bytes. name identifies the backend in the
+    # render cache and language is the text it renders: plantuml or dot.
+    name: str = ''
+    language: str = 'plantuml'
+
+    def render(self, plantuml_text: str) -> bytes:
+        raise NotImplementedError
+
+    def render_batch(self, plantuml_texts: list[str]) -> list[bytes]:
+        return [self.render(plantuml_text) for plantuml_text in plantuml_texts]
+
+    def close(self) -> None:
+        pass
+
+
+class HTTPRenderer(Renderer):
+    # Renders with a PlantUML server: the public one by default, or a local
+    # one given the URL of its PNG endpoint (e.g. http://localhost:8080/png/).
+    # Batches are rendered concurrently over one keep-alive session, and
+    # failed requests are retried with exponential backoff. Diagrams whose
+    # URL would exceed max_url_length are POSTed instead.
+    def __init__(
+        self,
+        url: str = SERVER_URL,
+        max_workers: int = 16,
+        timeout: float = 30.0,
+        retries: int = 3,
+        session: Optional[requests.Session] = None,
+        compression_level: int = -1,
+        max_url_length: int = 4096,
+    ) -> None:
+        self.url: str = url if url.endswith('/') else f'{url}/'
+        self.name: str = self.url
+        self.max_workers: int = max_workers
+        self.timeout: float = timeout
+        self.retries: int = retries
+        self.session: Optional[requests.Session] = session
+        self.compression_level: int = compression_level
+        self.max_url_length: int = max_url_length
+        self.lock: threading.Lock = threading.Lock()
+
+    def get_session(self) -> requests.Session:
+        with self.lock:
+            if self.session is None:
+                session: requests.Session = requests.Session()
+                adapter: HTTPAdapter = HTTPAdapter(
+                    pool_connections=self.max_workers,
+                    pool_maxsize=self.max_workers,
+                    max_retries=Retry(
+                        total=self.retries,
+                        backoff_factor=0.5,
+                        status_forcelist=(429, 500, 502, 503, 504),
+                        allowed_methods=('GET', 'POST'),
+                    ),
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self.session = session
+            return self.session
+
+    def render(self, plantuml_text: str) -> bytes:
+        url: str = f'{self.url}{encode_plantuml(plantuml_text, self.compression_level)}'
+        if len(url) <= self.max_url_length:
+            response: requests.Response = self.get_session().get(
+                url, timeout=self.timeout
+            )
+        else:
+            # Servers and proxies reject or truncate long URLs, so large
+            # diagrams are sent in the request body
+            response = self.get_session().post(
+                self.url.rstrip('/'),
+                data=plantuml_text.encode('utf-8'),
+                headers={'Content-Type': 'text/plain; charset=utf-8'},
+                timeout=self.timeout,
+            )
+        response.raise_for_status()
+        return response.content
+
+    def render_batch(self, plantuml_texts: list[str]) -> list[bytes]:
+        if len(plantuml_texts) < 2:
+            return super().render_batch(plantuml_texts)
+        with ThreadPoolExecutor(min(self.max_workers, len(plantuml_texts))) as executor:
+            return list(executor.map(self.render, plantuml_texts))
+
+    def close(self) -> None:
+        with self.lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+
+class LocalRenderer(Renderer):
+    # Renders with a local PlantUML executable (or java -jar plantuml.jar),
+    # passing the diagrams through stdin/stdout. A batch is rendered by a
+    # single process.
+    def __init__(self, command: list[str]) -> None:
+        self.command: list[str] = command
+        self.name: str = shlex.join(command)
+
+    def render(self, plantuml_text: str) -> bytes:
+        return self._run([], plantuml_text)
+
+    def render_batch(self, plantuml_texts: list[str]) -> list[bytes]:
+        if len(plantuml_texts) < 2:
+            return super().render_batch(plantuml_texts)
+
+        delimiter: str = f'ONTOL-{uuid.uuid4().hex}'
+        output: bytes = self._run(
+            ['-pipedelimitor', delimiter], join_diagrams(plantuml_texts)
+        )
+        images: list[bytes] = []
+        start: int = 0
+        while (
+            image := find_image(output, delimiter.encode('ascii'), start)
+        ) is not None:
+            end, next_start = image
+            images.append(output[start:end])
+            start = next_start
+        if len(images) != len(plantuml_texts):
+            raise ValueError(
+                f'PlantUML rendered {len(images)} images for '
+                f'{len(plantuml_texts)} diagrams'
+            )
+        return images
+
+    def _run(self, options: list[str], plantuml_text: str) -> bytes:
+        try:
+            process: subprocess.CompletedProcess = subprocess.run(
+                [*self.command, '-tpng', '-pipe', *options],
+                input=plantuml_text.encode('utf-8'),
+                capture_output=True,
+            )
+        except OSError as error:
+            raise ValueError(
+                f"Could not run PlantUML '{shlex.join(self.command)}': {error}"
+            )
+
+        if process.returncode != 0:
+            raise ValueError(
+                f'PlantUML exited with status {process.returncode}: '
+                f'{process.stderr.decode("utf-8", "replace").strip()}'
+            )
+        return process.stdout
+
+
+class PipeRenderer(Renderer):
+    # Keeps one PlantUML process running in -pipe mode, so the JVM starts once
+    # instead of once per diagram. A batch of diagrams is written to its stdin
+    # at once and the images are read back in order, each one followed by a
+    # delimiter line. A process that crashed or stopped responding is
+    # restarted and the batch is retried once.
+    def __init__(self, command: list[str], timeout: float = 60.0) -> None:
+        self.command: list[str] = command
+        self.name: str = shlex.join(command)
+        self.timeout: float = timeout
+        self.delimiter: bytes = f'ONTOL-{uuid.uuid4().hex}'.encode('ascii')
+        self.process: Optional[subprocess.Popen] = None
+        self.output: queue.Queue[bytes] = queue.Queue()
+        self.buffer: bytearray = bytearray()
+        self.lock: threading.Lock = threading.Lock()
+
+    def render(self, plantuml_text: str) -> bytes:
+        return self.render_batch([plantuml_text])[0]
+
+    def render_batch(self, plantuml_texts: list[str]) -> list[bytes]:
+        with self.lock:
+            for attempt in range(2):
+                try:
+                    return self._render_batch(plantuml_texts)
+                except ValueError:
+                    # The process may be left in the middle of a diagram
+                    self._stop()
+                    if attempt:
+                        raise
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def check_health(self) -> bool:
+        # The process is running and still renders diagrams
+        with self.lock:
+            if not self.is_alive():
+                return False
+            try:
+                self._render_batch(['@startuml\n@enduml'])
+            except ValueError:
+                self._stop()
+                return False
+            return True
+
+    def close(self) -> None:
+        with self.lock:
+            if self.process is None:
+                return
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            self._stop()
+
+    def _start(self) -> None:
+        try:
+            self.process = subprocess.Popen(
+                [
+                    *self.command,
+                    '-tpng',
+                    '-pipe',
+                    '-pipedelimitor',
+                    self.delimiter.decode('ascii'),
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as error:
+            raise ValueError(
+                f"Could not run PlantUML '{shlex.join(self.command)}': {error}"
+            )
+        # stdout is drained by a thread, so the process never blocks on a full
+        # pipe while a batch is being written and reads can time out
+        self.output = queue.Queue()
+        self.buffer = bytearray()
+        threading.Thread(
+            target=self._read_output,
+            args=(self.process.stdout, self.output),
+            daemon=True,
+        ).start()
+
+    def _stop(self) -> None:
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        self.process = None
+
+    @staticmethod
+    def _read_output(stdout: IO[bytes], output: queue.Queue) -> None:
+        try:
+            while chunk := stdout.read1(65536):
+                output.put(chunk)
+        except (OSError, ValueError):
+            pass
+        output.put(b'')
+
+    def _render_batch(self, plantuml_texts: list[str]) -> list[bytes]:
+        if not self.is_alive():
+            self._stop()
+            self._start()
+
+        try:
+            self.process.stdin.write(join_diagrams(plantuml_texts).encode('utf-8'))
+            self.process.stdin.flush()
+        except OSError as error:
+            raise ValueError(f'Could not write to PlantUML: {error}')
+        return [self._read_image() for _ in plantuml_texts]
+
+    def _read_image(self) -> bytes:
+        deadline: float = time.monotonic() + self.timeout
+        while (image := find_image(self.buffer, self.delimiter)) is None:
+            try:
+                chunk: bytes = self.output.get(
+                    timeout=max(deadline - time.monotonic(), 0)
+                )
+            except queue.Empty:
+                raise ValueError(
+                    f'PlantUML did not render the diagram in {self.timeout} seconds'
+                )
+            if not chunk:
+                raise ValueError(f'PlantUML exited with status {self.process.wait()}')
+            self.buffer += chunk
+
+        end, start = image
+        data: bytes = bytes(self.buffer[:end])
+        del self.buffer[:start]
+        return data
+
+
+class DotRenderer(Renderer):
+    # Renders Graphviz DOT (see DotGenerator) with a local dot binary, without
+    # PlantUML and its JVM. A batch is rendered by a single process: dot
+    # renders every graph of its input and writes the images one after another.
+    language: str = 'dot'
+
+    def __init__(self, command: Optional[list[str]] = None) -> None:
+        self.command: list[str] = command or ['dot']
+        self.name: str = shlex.join(self.command)
+
+    def render(self, dot_text: str) -> bytes:
+        return self._run(dot_text)
+
+    def render_batch(self, dot_texts: list[str]) -> list[bytes]:
+        if len(dot_texts) < 2:
+            return super().render_batch(dot_texts)
+
+        output: bytes = self._run('\n'.join(dot_texts))
+        images: list[bytes] = []
+        start: int = 0
+        while (end := output.find(PNG_END, start)) != -1:
+            images.append(output[start : end + len(PNG_END)])
+            start = end + len(PNG_END)
+        if len(images) != len(dot_texts):
+            raise ValueError(
+                f'Graphviz rendered {len(images)} images for {len(dot_texts)} graphs'
+            )
+        return images
+
+    def _run(self, dot_text: str) -> bytes:
+        try:
+            process: subprocess.CompletedProcess = subprocess.run(
+                [*self.command, '-Tpng'],
+                input=dot_text.encode('utf-8'),
+                capture_output=True,
+            )
+        except OSError as error:
+            raise ValueError(f"Could not run Graphviz '{self.name}': {error}")
+
+        if process.returncode != 0:
+            raise ValueError(
+                f'Graphviz exited with status {process.returncode}: '
+                f'{process.stderr.decode("utf-8", "replace").strip()}'
+            )
+        return process.stdout
+
+
+def is_dot_command(command: list[str]) -> bool:
+    program: str = os.path.basename(command[0]) if command else ''
+    return os.path.splitext(program)[0] == 'dot'
+
+
+def get_plantuml_command(spec: str) -> list[str]:
+    # The path of plantuml.jar or a PlantUML command line
+    if spec.endswith('.jar'):
+        return ['java', '-jar', spec]
+    return shlex.split(spec)
+
+
+def get_renderer(spec: Optional[str] = None) -> Renderer:
+    # spec (or the ONTOL_RENDERER environment variable) is either the URL of a
+    # PlantUML server, the path of plantuml.jar, a PlantUML command line or a
+    # Graphviz dot command line. A jar path or PlantUML command prefixed with
+    # local: runs one PlantUML process per render instead of keeping one
+    # running in -pipe mode.
+    spec = spec or os.getenv('ONTOL_RENDERER')
+    if not spec:
+        return HTTPRenderer()
+    if spec.startswith(LOCAL_PREFIX):
+        return LocalRenderer(get_plantuml_command(spec[len(LOCAL_PREFIX) :]))
+    if is_url(spec):
+        return HTTPRenderer(spec)
+    if spec.endswith('.jar'):
+        return PipeRenderer(get_plantuml_command(spec))
+    command: list[str] = shlex.split(spec)
+    if is_dot_command(command):
+        return DotRenderer(command)
+    return PipeRenderer(command)
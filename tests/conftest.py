@@ -0,0 +1,67 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+
+def write(path, content):
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def http_server(request, tmp_path):
+    # Serves tmp_path and records every request with its If-None-Match header.
+    # The barrier, etag and cache_control attributes can be set by the test or
+    # through indirect parametrization.
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            server = self.server
+            path = urlsplit(self.path).path
+            server.requests.append((path, self.headers.get('If-None-Match')))
+            if server.barrier is not None:
+                server.barrier.wait()
+            if (
+                server.etag is not None
+                and self.headers.get('If-None-Match') == server.etag
+            ):
+                self.send_response(304)
+                self.send_header('Cache-Control', server.cache_control)
+                self.end_headers()
+                return
+
+            file_path = os.path.join(str(tmp_path), path.lstrip('/'))
+            if not os.path.isfile(file_path):
+                self.send_error(404)
+                return
+            with open(file_path, 'rb') as file:
+                body = file.read()
+            self.send_response(200)
+            if server.etag is not None:
+                self.send_header('ETag', server.etag)
+            if server.cache_control is not None:
+                self.send_header('Cache-Control', server.cache_control)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.requests = []
+    server.barrier = None
+    server.etag = None
+    server.cache_control = None
+    for name, value in getattr(request, 'param', {}).items():
+        setattr(server, name, value)
+    server.url = f'http://127.0.0.1:{server.server_address[1]}'
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,301 @@
+import os
+import threading
+
+import requests
+
+from ontol import Parser, PlantUML
+from ontol.cache import (
+    DiskCache,
+    HTTPCache,
+    OntologyCache,
+    RenderCache,
+    get_code_hash,
+)
+from ontol.imports import SourceFetcher
+from ontol.renderers import Renderer
+
+import pytest
+
+from .conftest import write
+
+
+@pytest.fixture
+def ontology_cache(tmp_path):
+    return OntologyCache(str(tmp_path / 'cache'))
+
+
+def test_ontology_cache_skips_parsing(tmp_path, ontology_cache, monkeypatch):
+    content = "types:\nset: '', 'A set'\n"
+    file_path = str(tmp_path / 'main.ontol')
+
+    ontology, warnings = Parser(ontology_cache=ontology_cache).parse(content, file_path)
+    assert ontology_cache.misses == 1
+
+    def fail(*args):
+        raise AssertionError('the file should not be parsed')
+
+    monkeypatch.setattr(Parser, '_parse_source', fail)
+    cached_ontology, cached_warnings = Parser(ontology_cache=ontology_cache).parse(
+        content, file_path
+    )
+
+    assert ontology_cache.hits == 1
+    assert cached_ontology.types == ontology.types
+    assert cached_ontology.meta.date == ontology.meta.date
+    assert list(map(str, cached_warnings)) == list(map(str, warnings))
+
+
+def test_ontology_cache_checks_imports(tmp_path, ontology_cache):
+    base_path = write(tmp_path / 'base.ontol', "types:\nset: 'Set', 'A set'\n")
+    write(tmp_path / 'middle.ontol', "import * from 'base.ontol'\n")
+    content = "import * from 'middle.ontol'\n"
+    file_path = str(tmp_path / 'main.ontol')
+
+    Parser(ontology_cache=ontology_cache).parse(content, file_path)
+    Parser(ontology_cache=ontology_cache).parse(content, file_path)
+    assert (ontology_cache.hits, ontology_cache.misses) == (1, 1)
+
+    write(tmp_path / 'base.ontol', "types:\nelement: 'Element', 'An element'\n")
+    ontology, _ = Parser(ontology_cache=ontology_cache).parse(content, file_path)
+    assert (ontology_cache.hits, ontology_cache.misses) == (1, 2)
+    assert [term.name for term in ontology.types] == ['element']
+
+    os.remove(base_path)
+    with pytest.raises(ValueError):
+        Parser(ontology_cache=ontology_cache).parse(content, file_path)
+
+
+def test_ontology_cache_keeps_explicit_date(tmp_path, ontology_cache):
+    content = "date: '2020-01-01'\n"
+    file_path = str(tmp_path / 'main.ontol')
+
+    Parser(ontology_cache=ontology_cache).parse(content, file_path)
+    ontology, _ = Parser(ontology_cache=ontology_cache).parse(content, file_path)
+
+    assert ontology_cache.hits == 1
+    assert ontology.meta.date == '2020-01-01'
+
+
+def test_ontology_cache_key_follows_parser_code(ontology_cache, monkeypatch):
+    key = ontology_cache.get_key('', 'main.ontol')
+    monkeypatch.setattr('ontol.cache.get_version', lambda: 'other')
+    assert ontology_cache.get_key('', 'main.ontol') == key
+
+    monkeypatch.setattr('ontol.cache.PARSER_MODULES', ('ontol.parser',))
+    get_code_hash.cache_clear()
+    try:
+        assert ontology_cache.get_key('', 'main.ontol') != key
+    finally:
+        get_code_hash.cache_clear()
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path), max_size=0)
+    assert cache.put('a', 'a' * 100)
+    assert not os.path.exists(cache.get_path('a'))
+
+    cache.max_size = 1000
+    cache.put('a', 'a' * 100)
+    cache.put('b', 'b' * 100)
+    os.utime(cache.get_path('a'), (0, 0))
+    os.utime(cache.get_path('b'), (1, 1))
+    assert cache.get('a') == 'a' * 100
+
+    # Eviction goes down to 90% of max_size, which two entries fit in
+    cache.max_size = os.path.getsize(cache.get_path('a')) * 5 // 2
+    cache.put('c', 'c' * 100)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'a' * 100
+    assert cache.get('c') == 'c' * 100
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    cache.clear()
+    assert cache.get('a') is None
+
+
+def test_disk_cache_scans_only_to_evict(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path))
+    cache.put('old', 'o' * 100)
+    entry_size = os.path.getsize(cache.get_path('old'))
+
+    scans = []
+    list_entries = DiskCache._list_entries
+
+    def counting_list_entries(self):
+        scans.append(self)
+        return list_entries(self)
+
+    monkeypatch.setattr(DiskCache, '_list_entries', counting_list_entries)
+    cache = DiskCache(str(tmp_path), max_size=entry_size * 100)
+    for index in range(1000):
+        assert cache.put(f'{index:04}', str(index % 10) * 100)
+        assert cache.size == sum(
+            os.path.getsize(entry.path) for entry in os.scandir(tmp_path)
+        )
+        assert cache.size <= cache.max_size
+
+    # One scan for the first store, then one per eviction, each of which
+    # frees room for 10 more entries
+    assert len(scans) <= 1 + 1000 // 10
+    assert 90 <= len(os.listdir(tmp_path)) <= 100
+    assert not os.path.exists(cache.get_path('old'))
+
+
+@pytest.fixture
+def document(tmp_path, http_server):
+    # One document whose ETag the tests change along with its content
+    http_server.etag = '"1"'
+    if http_server.cache_control is None:
+        http_server.cache_control = 'no-cache'
+    write(tmp_path / 'base.ontol', "types:\nset: 'Set', 'A set'\n")
+    return f'{http_server.url}/base.ontol'
+
+
+def test_http_cache_revalidates(tmp_path, http_server, document):
+    http_cache = HTTPCache(str(tmp_path / 'cache'))
+    fetcher = SourceFetcher(http_cache=http_cache)
+
+    assert fetcher.fetch(document) == "types:\nset: 'Set', 'A set'\n"
+    assert fetcher.fetch(document) == "types:\nset: 'Set', 'A set'\n"
+    assert [etag for _, etag in http_server.requests] == [None, '"1"']
+
+    write(tmp_path / 'base.ontol', "types:\nelement: 'Element', 'An element'\n")
+    http_server.etag = '"2"'
+    assert fetcher.fetch(document) == "types:\nelement: 'Element', 'An element'\n"
+    assert [etag for _, etag in http_server.requests] == [None, '"1"', '"1"']
+
+
+@pytest.mark.parametrize(
+    'http_server', [{'cache_control': 'public, max-age=3600'}], indirect=True
+)
+def test_http_cache_honours_max_age(tmp_path, http_server, document):
+    fetcher = SourceFetcher(http_cache=HTTPCache(str(tmp_path / 'cache')))
+
+    content = f"import * from '{document}'\n"
+    for _ in range(3):
+        ontology, _ = Parser(fetcher=fetcher).parse(content, 'main.ontol')
+        assert [term.name for term in ontology.types] == ['set']
+    assert http_server.requests == [('/base.ontol', None)]
+
+
+def test_http_cache_offline(tmp_path, http_server, document):
+    fetcher = SourceFetcher(http_cache=HTTPCache(str(tmp_path / 'cache')))
+    fetcher.fetch(document)
+
+    offline_fetcher = SourceFetcher(
+        http_cache=HTTPCache(str(tmp_path / 'cache'), offline=True)
+    )
+    assert offline_fetcher.fetch(document) == "types:\nset: 'Set', 'A set'\n"
+    assert http_server.requests == [('/base.ontol', None)]
+
+    with pytest.raises(requests.ConnectionError):
+        offline_fetcher.fetch(f'{document}.missing')
+
+
+@pytest.mark.parametrize('http_server', [{'cache_control': 'no-store'}], indirect=True)
+def test_http_cache_skips_no_store(tmp_path, http_server, document):
+    http_cache = HTTPCache(str(tmp_path / 'cache'))
+    fetcher = SourceFetcher(http_cache=http_cache)
+
+    fetcher.fetch(document)
+    fetcher.fetch(document)
+
+    assert [etag for _, etag in http_server.requests] == [None, None]
+    assert http_cache.hits == 0
+
+
+class CountingRenderer(Renderer):
+    name = 'counting'
+
+    def __init__(self):
+        self.rendered = []
+
+    def render(self, plantuml_text):
+        self.rendered.append(plantuml_text)
+        return plantuml_text.encode('utf-8')
+
+
+def test_render_cache_links_cached_images(tmp_path):
+    renderer = CountingRenderer()
+    render_cache = RenderCache(str(tmp_path / 'renders'))
+    plantuml = PlantUML(renderer=renderer, render_cache=render_cache)
+    a_path, b_path = str(tmp_path / 'a.png'), str(tmp_path / 'b.png')
+
+    plantuml.render_pngs([('@startuml\nA\n@enduml', a_path)])
+    plantuml.render_pngs(
+        [('@startuml\nA\n@enduml', a_path), ('@startuml\nB\n@enduml', b_path)]
+    )
+    assert renderer.rendered == ['@startuml\nA\n@enduml', '@startuml\nB\n@enduml']
+    assert (render_cache.hits, render_cache.misses) == (1, 2)
+
+    # Re-rendering a linked output must leave the cached image untouched
+    plantuml.render_pngs([('@startuml\nB\n@enduml', a_path)])
+    plantuml.render_pngs([('@startuml\nC\n@enduml', a_path)])
+    plantuml.render_pngs([('@startuml\nA\n@enduml', b_path)])
+    with (
+        open(a_path, encoding='utf-8') as a_file,
+        open(b_path, encoding='utf-8') as b_file,
+    ):
+        assert (a_file.read(), b_file.read()) == (
+            '@startuml\nC\n@enduml',
+            '@startuml\nA\n@enduml',
+        )
+    assert len(renderer.rendered) == 3
+
+
+def test_render_cache_key(tmp_path):
+    render_cache = RenderCache(str(tmp_path))
+    keys = {
+        render_cache.get_key('@startuml\n@enduml', 'http://localhost/png/'),
+        render_cache.get_key('@startuml\n@enduml', 'plantuml'),
+        render_cache.get_key('@startuml\n@enduml', 'plantuml', 'svg'),
+        render_cache.get_key('@startuml\n\n@enduml', 'plantuml'),
+    }
+    assert len(keys) == 4
+
+    render_cache.max_size = 10
+    assert render_cache.store('a', b'a' * 8)
+    assert render_cache.store('b', b'b' * 8)
+    assert sorted(os.listdir(tmp_path)) in (['a.png'], ['b.png'])
+
+
+def test_ontology_cache_checks_remote_imports_concurrently(
+    tmp_path, ontology_cache, http_server, document
+):
+    # Every request waits for the others, so serial checks would time out
+    http_server.barrier = threading.Barrier(3, timeout=5)
+    content = ''.join(
+        f"import {{ set as s{index} }} from '{document}?{index}'\n"
+        for index in range(3)
+    )
+    file_path = str(tmp_path / 'main.ontol')
+
+    Parser(ontology_cache=ontology_cache).parse(content, file_path)
+    Parser(ontology_cache=ontology_cache).parse(content, file_path)
+    assert (ontology_cache.hits, ontology_cache.misses) == (1, 1)
+    assert len(http_server.requests) == 6
+
+
+def test_render_cache_stores_batches_without_scanning(tmp_path, monkeypatch):
+    scans = []
+    list_entries = DiskCache._list_entries
+
+    def counting_list_entries(self):
+        scans.append(self)
+        return list_entries(self)
+
+    monkeypatch.setattr(DiskCache, '_list_entries', counting_list_entries)
+    render_cache = RenderCache(str(tmp_path / 'renders'))
+    plantuml = PlantUML(renderer=CountingRenderer(), render_cache=render_cache)
+    diagrams = [
+        (f'@startuml\nA{index}\n@enduml', str(tmp_path / f'{index}.png'))
+        for index in range(200)
+    ]
+
+    plantuml.render_pngs(diagrams)
+    assert render_cache.misses == 200
+    assert len(scans) == 1
+    assert render_cache.size == sum(
+        os.path.getsize(entry.path) for entry in os.scandir(tmp_path / 'renders')
+    )
@@ -1,7 +1,7 @@
 import os
 import tempfile
 
-from ontol import CLI
+from ontol import CLI, constants
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -78,3 +78,143 @@ def test_watch_file_no_changes(cli):
         mock_schedule.assert_called()
         mock_start.assert_called()
         mock_join.assert_called()
+
+
+def test_run_in_parallel_matches_serial_run(tmp_path, monkeypatch, capsys):
+    for index in range(6):
+        (tmp_path / f'{index}.ontol').write_text(
+            f"version: ''\ntypes:\nterm{index}: 'Term', ''\n", encoding='utf-8'
+        )
+    (tmp_path / 'broken.ontol').write_text('types:\n)\n', encoding='utf-8')
+
+    def run(*options: str) -> tuple[int, str]:
+        argv = [
+            'ontol',
+            str(tmp_path),
+            '--cache-dir',
+            str(tmp_path / 'cache'),
+            '--emit',
+            'json,puml',
+        ]
+        monkeypatch.setattr('sys.argv', [*argv, *options])
+        status = CLI().run()
+        return status, capsys.readouterr().out
+
+    status, output = run('--jobs', '3')
+    assert status == 1
+    assert output.index('0.ontol') < output.index('5.ontol') < output.index('broken')
+    assert os.path.exists(tmp_path / '5.json')
+    assert run('--jobs', '3') == run() == (status, output)
+
+    os.remove(tmp_path / 'broken.ontol')
+    assert run('--jobs', '3')[0] == 0
+
+
+def test_jobs_parse_the_imports_of_a_single_file(tmp_path, monkeypatch, capsys):
+    for name in ['a', 'b', 'c']:
+        (tmp_path / f'{name}.ontol').write_text(
+            f"types:\n{name}: '{name}', '{name}'\n", encoding='utf-8'
+        )
+    main_path = tmp_path / 'main.ontol'
+    main_path.write_text(
+        "version: ''\n"
+        + ''.join(f"import * from '{name}.ontol'\n" for name in ['a', 'b', 'c']),
+        encoding='utf-8',
+    )
+    monkeypatch.setattr(
+        'sys.argv',
+        ['ontol', str(main_path), '--no-cache', '--emit', 'json', '--jobs', '2'],
+    )
+
+    with patch(
+        'ontol.parser.Parser._parse_imports_in_parallel', autospec=True
+    ) as mock_parse:
+        assert CLI().run() == 0
+    mock_parse.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    'emit, extensions, rendered',
+    [
+        ('none', [], []),
+        ('json', ['.json'], []),
+        ('puml, JSON', ['.json', '.puml'], []),
+        ('json,png', ['.json'], ['main.png']),
+    ],
+)
+def test_emit_selects_outputs(tmp_path, monkeypatch, emit, extensions, rendered):
+    renders = []
+    monkeypatch.setattr(
+        'ontol.PlantUML.render_pngs', lambda self, diagrams: renders.append(diagrams)
+    )
+    file_path = tmp_path / 'main.ontol'
+    file_path.write_text("types:\nterm: 'Term', ''\n", encoding='utf-8')
+
+    monkeypatch.setattr(
+        'sys.argv', ['ontol', str(file_path), '--emit', emit, '--no-cache']
+    )
+    assert CLI().run() == 0
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ['main.ontol', *(f'main{extension}' for extension in extensions)]
+    )
+    assert [
+        os.path.basename(outfile) for diagrams in renders for _, outfile in diagrams
+    ] == rendered
+
+
+def test_emit_rejects_unknown_outputs(cli):
+    with pytest.raises(SystemExit):
+        cli.args_parser.parse_args(['main.ontol', '--emit', 'json,svg'])
+
+
+def test_max_edges_warning(tmp_path, monkeypatch, capsys):
+    file_path = tmp_path / 'main.ontol'
+    file_path.write_text(
+        "types:\na: 'A', 'a'\nb: 'B', 'b'\nhierarchy:\na aggregation b\nb dependence a\n",
+        encoding='utf-8',
+    )
+
+    monkeypatch.setattr(
+        'sys.argv',
+        ['ontol', str(file_path), '--emit', 'none', '--no-cache', '--max-edges', '1'],
+    )
+    assert CLI().run() == 0
+    assert (
+        f'{constants.warning_prefix} too much edges. Expected: 1, got: 2'
+        in capsys.readouterr().out
+    )
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_cache_stats_are_printed(tmp_path, monkeypatch, capsys, jobs):
+    for index in range(2):
+        (tmp_path / f'{index}.ontol').write_text(
+            f"types:\nterm{index}: 'Term', 'A term'\n", encoding='utf-8'
+        )
+
+    def run() -> str:
+        monkeypatch.setattr(
+            'sys.argv',
+            [
+                'ontol',
+                str(tmp_path),
+                '--cache-dir',
+                str(tmp_path / 'cache'),
+                '--emit',
+                'json',
+                '--jobs',
+                jobs,
+                '--cache-stats',
+            ],
+        )
+        assert CLI().run() == 0
+        return capsys.readouterr().out
+
+    assert '  ontologies: 0 hits, 2 misses\n' in run()
+    output = run()
+    assert output.endswith(
+        'Cache statistics:\n'
+        '  ontologies: 2 hits, 0 misses\n'
+        '  http: 0 hits, 0 misses\n'
+        '  renders: 0 hits, 0 misses\n'
+    )
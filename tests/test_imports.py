@@ -0,0 +1,348 @@
+import glob
+import os
+import threading
+
+from ontol import Parser, Ontology
+from ontol.imports import DefinitionIndex, ImportCache, ParsedOntology, SourceFetcher
+from ontol.parser import Lexer
+
+import pytest
+
+from .conftest import write
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'examples')
+
+
+@pytest.fixture(params=['lalr', 'descent'])
+def engine(request):
+    return request.param
+
+
+def test_diamond_import_is_parsed_once(tmp_path, engine):
+    write(tmp_path / 'base.ontol', "types:\nset: '', 'A set'\n")
+    write(tmp_path / 'left.ontol', "import * from 'base.ontol'\n")
+    write(tmp_path / 'right.ontol', "import { set as s } from 'base.ontol'\n")
+    main_path = write(
+        tmp_path / 'main.ontol',
+        "import * from 'left.ontol'\nimport * from 'right.ontol'\n",
+    )
+
+    parser = Parser(engine=engine)
+    with open(main_path, encoding='utf-8') as file:
+        ontology, warnings = parser.parse(file.read(), main_path)
+
+    assert [term.name for term in ontology.types] == ['set', 's']
+    assert parser.import_cache.misses == 3
+    assert parser.import_cache.hits == 1
+    assert len(parser.import_cache) == 3
+    assert [warning.message for warning in warnings] == ['Term label is empty']
+
+
+def test_alias_does_not_modify_cached_ontology(tmp_path, engine):
+    write(
+        tmp_path / 'base.ontol',
+        "types:\nset: 'Set', 'A set'\nelement: 'Element', 'An element'\n\n"
+        'hierarchy:\nhas: element aggregation set\n',
+    )
+    main_path = write(
+        tmp_path / 'main.ontol',
+        "import { set as s, element as e } from 'base.ontol'\n",
+    )
+
+    parser = Parser(engine=engine)
+    ontology, _ = parser.parse(
+        "import { set as s, element as e } from 'base.ontol'\n", main_path
+    )
+    assert [term.name for term in ontology.types] == ['s', 'e']
+
+    (cached,) = parser.import_cache.entries.values()
+    assert [term.name for term in cached.ontology.types] == ['set', 'element']
+
+    ontology, _ = parser.parse("import * from 'base.ontol'\n", main_path)
+    assert [term.name for term in ontology.types] == ['set', 'element']
+    assert ontology.hierarchy[0].parent is ontology.find_term_by_name('element')
+    assert ontology.hierarchy[0].children[0] is ontology.find_term_by_name('set')
+
+
+def test_alias_remaps_relationship_terms(tmp_path, engine):
+    write(
+        tmp_path / 'base.ontol',
+        "types:\nset: 'Set', 'A set'\nelement: 'Element', 'An element'\n\n"
+        'hierarchy:\nhas: element aggregation set\n',
+    )
+    main_path = str(tmp_path / 'main.ontol')
+
+    ontology, _ = Parser(engine=engine).parse(
+        "import { set as s, has } from 'base.ontol'\n", main_path
+    )
+    relationship = ontology.hierarchy[0]
+    assert relationship.parent is ontology.find_term_by_name('element')
+    assert relationship.children[0] is ontology.find_term_by_name('s')
+    assert ontology.find_term_by_name('set') is None
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_edited_nested_import_is_parsed_again(tmp_path, engine, jobs):
+    b_path = write(tmp_path / 'b.ontol', "types:\nbterm: 'B', 'b'\n")
+    write(tmp_path / 'a.ontol', "import * from 'b.ontol'\ntypes:\naterm: 'A', 'a'\n")
+    write(tmp_path / 'c.ontol', "types:\ncterm: 'C', 'c'\n")
+    main_path = str(tmp_path / 'main.ontol')
+    content = "import * from 'a.ontol'\nimport * from 'c.ontol'\n"
+
+    parser = Parser(engine=engine, jobs=jobs)
+    ontology, _ = parser.parse(content, main_path)
+    assert [term.name for term in ontology.types] == ['bterm', 'aterm', 'cterm']
+
+    write(tmp_path / 'b.ontol', "types:\nbrenamed: 'B', 'b'\n")
+    ontology, _ = parser.parse(content, main_path)
+    assert [term.name for term in ontology.types] == ['brenamed', 'aterm', 'cterm']
+    assert parser.parse(content, main_path)[0].types == ontology.types
+
+    os.remove(b_path)
+    with pytest.raises(ValueError, match='not found'):
+        parser.parse(content, main_path)
+
+
+def test_import_cache_evicts_least_recently_used():
+    cache = ImportCache(max_entries=2)
+    entries = [ParsedOntology((str(i), ''), Ontology(), []) for i in range(3)]
+
+    cache.put(entries[0])
+    cache.put(entries[1])
+    assert cache.get(entries[0].key) is entries[0]
+    cache.put(entries[2])
+
+    assert cache.get(entries[1].key) is None
+    assert cache.get(entries[0].key) is entries[0]
+    assert cache.get(entries[2].key) is entries[2]
+
+
+def test_remote_imports_are_fetched_concurrently(tmp_path, http_server, engine):
+    names = ['a', 'b', 'c']
+    for name in names:
+        write(tmp_path / f'{name}.ontol', f"types:\n{name}: '{name}', '{name}'\n")
+    content = ''.join(
+        f"import * from '{http_server.url}/{name}.ontol'\n" for name in names
+    )
+
+    # Every request waits for the others, so serial fetching would time out
+    http_server.barrier = threading.Barrier(len(names), timeout=5)
+    ontology, _ = Parser(engine=engine).parse(content, str(tmp_path / 'main.ontol'))
+
+    assert [term.name for term in ontology.types] == names
+    assert sorted(path for path, _ in http_server.requests) == [
+        f'/{name}.ontol' for name in names
+    ]
+
+
+def test_nested_imports_are_prefetched(tmp_path, http_server):
+    write(tmp_path / 'base.ontol', "types:\nset: 'Set', 'A set'\n")
+    write(tmp_path / 'remote.ontol', "import * from 'base.ontol'\n")
+    write(tmp_path / 'local.ontol', f"import * from '{http_server.url}/remote.ontol'\n")
+    file_path = str(tmp_path / 'main.ontol')
+    content = "import * from 'local.ontol'\n"
+
+    fetcher = SourceFetcher()
+    graph = fetcher.prefetch(content, file_path, Lexer)
+    assert (
+        set(fetcher.contents)
+        == set(graph.paths)
+        == {
+            os.path.realpath(file_path),
+            os.path.realpath(tmp_path / 'local.ontol'),
+            f'{http_server.url}/remote.ontol',
+            f'{http_server.url}/base.ontol',
+        }
+    )
+
+    def fail(source):
+        raise AssertionError(f'{source} should have been prefetched')
+
+    fetcher.fetch = fail
+    ontology, _ = Parser(fetcher=fetcher)._parse_source(content, file_path)
+    assert [term.name for term in ontology.types] == ['set']
+
+
+def test_prefetch_errors_are_reported_by_the_parse(tmp_path, http_server):
+    content = f"import * from '{http_server.url}/missing.ontol'\n"
+
+    with pytest.raises(ValueError, match='could not fetch the file: 404'):
+        Parser().parse(content, str(tmp_path / 'main.ontol'))
+
+
+def test_import_cycle_is_reported(tmp_path, engine):
+    write(tmp_path / 'a.ontol', "import * from 'b.ontol'\n")
+    write(
+        tmp_path / 'b.ontol', "types:\nset: 'Set', 'A set'\n\nimport * from 'c.ontol'\n"
+    )
+    write(tmp_path / 'c.ontol', "import * from 'b.ontol'\n")
+    file_path = str(tmp_path / 'a.ontol')
+
+    with pytest.raises(ValueError) as error:
+        Parser(engine=engine).parse("import * from 'b.ontol'\n", file_path)
+
+    b_path = os.path.join(tmp_path, 'b.ontol')
+    c_path = os.path.join(tmp_path, 'c.ontol')
+    message = str(error.value)
+    assert message.startswith(f'File "{c_path}", line 1')
+    assert message.endswith(f'import cycle: {b_path} -> {c_path} -> {b_path}')
+
+
+def test_long_import_chain_has_no_cycle(tmp_path):
+    count = 2000
+    for i in range(count):
+        write(tmp_path / f'{i}.ontol', f"import * from '{i + 1}.ontol'\n")
+    write(tmp_path / f'{count}.ontol', "types:\nset: 'Set', 'A set'\n")
+
+    graph = SourceFetcher().prefetch(
+        "import * from '0.ontol'\n", str(tmp_path / 'main.ontol'), Lexer
+    )
+    assert len(graph.imports) == count + 2
+    assert graph.find_cycle() is None
+
+
+def test_parallel_import_parse(tmp_path, engine):
+    write(tmp_path / 'base.ontol', "types:\nset: '', 'A set'\n")
+    for name in ['left', 'right']:
+        write(
+            tmp_path / f'{name}.ontol',
+            f"import {{ set as {name}_set }} from 'base.ontol'\n\n"
+            f"types:\n{name}: '{name}', ''\n",
+        )
+    write(tmp_path / 'broken.ontol', 'types:\nset\n')
+    file_path = str(tmp_path / 'main.ontol')
+    content = "import * from 'left.ontol'\nimport * from 'right.ontol'\n"
+
+    serial_ontology, serial_warnings = Parser(engine=engine).parse(content, file_path)
+    parser = Parser(engine=engine, jobs=2)
+    ontology, warnings = parser.parse(content, file_path)
+
+    assert ontology.types == serial_ontology.types
+    assert list(map(str, warnings)) == list(map(str, serial_warnings))
+    assert parser.import_cache.misses == 3
+    assert parser.import_cache.hits == 2
+
+    with pytest.raises(SyntaxError) as error:
+        parser.parse(content + "import * from 'broken.ontol'\n", file_path)
+    assert 'broken.ontol' in str(error.value)
+
+
+SELECTIVE_SOURCE = """version: '1.0'
+
+types:
+    set: 'Set', ''
+    element: 'Element', 'An element', {
+        color: '#D0FFD0'
+    }
+    unused: '', ''
+
+functions:
+    contains: 'Contains' (set: 'set', element: '') -> element: 'result'
+    unrelated: 'Unrelated' (unused: 'u') -> unused: 'u'
+
+hierarchy:
+    membership: element aggregation set
+    unused inheritance set
+
+figure 'Figure':
+    set
+    unused
+"""
+
+
+def test_selective_import_parses_requested_definitions(tmp_path, engine):
+    write(tmp_path / 'big.ontol', SELECTIVE_SOURCE)
+    file_path = str(tmp_path / 'main.ontol')
+
+    parser = Parser(engine=engine)
+    ontology, warnings = parser.parse(
+        "import { contains } from 'big.ontol'\n", file_path
+    )
+
+    assert [term.name for term in ontology.types] == ['set', 'element']
+    assert [function.name for function in ontology.functions] == ['contains']
+    assert [(warning.line_number, warning.message) for warning in warnings] == [
+        (4, 'Term description is empty'),
+        (11, 'Parameter label is empty'),
+    ]
+
+    (parsed,) = parser.import_cache.entries.values()
+    assert [term.name for term in parsed.ontology.types] == ['set', 'element']
+    assert [function.name for function in parsed.ontology.functions] == ['contains']
+    assert parsed.ontology.hierarchy == []
+    assert parsed.ontology.figures == []
+
+
+def test_selective_import_matches_full_import(tmp_path, engine, monkeypatch):
+    big_path = write(tmp_path / 'big.ontol', SELECTIVE_SOURCE)
+    file_path = str(tmp_path / 'main.ontol')
+    full_ontology, _ = Parser(engine=engine).parse(
+        "import * from 'big.ontol'\n", file_path
+    )
+    names = [
+        definition.name
+        for definition in full_ontology.types
+        + full_ontology.functions
+        + full_ontology.hierarchy
+    ]
+    examples = [
+        path
+        for path in glob.glob(os.path.join(EXAMPLES_DIR, '*.ontol'))
+        if 'import' not in open(path, encoding='utf-8').read()
+    ]
+
+    def parse(content):
+        return Parser(engine=engine).parse(content, file_path)
+
+    def parse_full(content):
+        with monkeypatch.context() as patch:
+            patch.setattr(DefinitionIndex, 'from_tokens', lambda *args: None)
+            return parse(content)
+
+    cases = [(big_path, [name]) for name in names] + [(big_path, names)]
+    for path in examples:
+        try:
+            ontology, _ = Parser(engine=engine).parse(
+                open(path, encoding='utf-8').read(), path
+            )
+        except SyntaxError:
+            continue
+        names = [term.name for term in ontology.types]
+        names += [function.name for function in ontology.functions]
+        cases += [(path, names[:1]), (path, names[-1:]), (path, names[::2])]
+
+    for path, selected_names in cases:
+        content = f"import {{ {', '.join(selected_names)} }} from '{path}'\n"
+        ontology, warnings = parse(content)
+        full_ontology, full_warnings = parse_full(content)
+
+        assert ontology.types == full_ontology.types
+        assert ontology.functions == full_ontology.functions
+        assert ontology.hierarchy == full_ontology.hierarchy
+        assert {str(warning) for warning in warnings} <= {
+            str(warning) for warning in full_warnings
+        }
+
+
+def test_selective_import_falls_back_to_full_parse(tmp_path):
+    write(tmp_path / 'base.ontol', "types:\nset: 'Set', 'A set'\n")
+    write(
+        tmp_path / 'big.ontol',
+        "import * from 'base.ontol'\n\ntypes:\nelement: 'Element', ''\n",
+    )
+
+    ontology, warnings = Parser().parse(
+        "import { set } from 'big.ontol'\n", str(tmp_path / 'main.ontol')
+    )
+
+    assert [term.name for term in ontology.types] == ['set']
+    assert [warning.message for warning in warnings] == ['Term description is empty']
+
+
+def test_selective_import_of_unknown_definition(tmp_path):
+    write(tmp_path / 'big.ontol', SELECTIVE_SOURCE)
+
+    with pytest.raises(ValueError, match='could not import definition missing'):
+        Parser().parse(
+            "import { missing } from 'big.ontol'\n", str(tmp_path / 'main.ontol')
+        )
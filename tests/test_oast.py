@@ -1,3 +1,5 @@
+from dataclasses import FrozenInstanceError
+
 from ontol import (
     Function,
     Meta,
@@ -9,6 +11,8 @@ from ontol import (
     TermAttributes,
 )
 
+import pytest
+
 
 def test_term_creation() -> None:
     term: Term = Term(name='test_term', label='TestTerm', description='A test term')
@@ -207,3 +211,101 @@ def test_ontology_operations():
     assert repr([concatenate]) in repr(ontology)
     assert repr([rel]) in repr(ontology)
     assert repr(meta) in repr(ontology)
+
+
+def test_ontology_find_definitions_by_name():
+    ontology: Ontology = Ontology()
+    number: Term = Term(name='number', label='Number')
+    duplicate: Term = Term(name='number', label='Duplicate')
+    add: Function = Function(
+        name='add',
+        label='Add',
+        input_types=[FunctionArgument(number, '')],
+        output_type=FunctionArgument(number, ''),
+    )
+    rel: Relationship = Relationship(
+        name='rel',
+        parent=number,
+        relationship=RelationshipType.COMPOSITION,
+        children=[number],
+    )
+
+    ontology.add_type(number)
+    ontology.add_type(duplicate)
+    ontology.add_function(add)
+    ontology.add_relationship(rel)
+
+    assert ontology.find_term_by_name('number') is number
+    assert ontology.find_function_by_name('add') is add
+    assert ontology.find_relationship_by_name('rel') is rel
+    assert ontology.find_definition_by_name('number') is number
+    assert ontology.find_definition_by_name('add') is add
+    assert ontology.find_definition_by_name('rel') is rel
+    assert ontology.find_term_by_name('add') is None
+    assert ontology.find_definition_by_name('missing') is None
+
+
+def test_ontology_find_definitions_after_direct_list_changes():
+    string: Term = Term(name='string', label='String')
+    ontology: Ontology = Ontology(types=[string])
+
+    assert ontology.find_term_by_name('string') is string
+
+    char: Term = Term(name='char', label='Char')
+    ontology.types.append(char)
+    ontology.hierarchy.extend(
+        [
+            Relationship(
+                name='rel',
+                parent=string,
+                relationship=RelationshipType.COMPOSITION,
+                children=[char],
+            )
+        ]
+    )
+
+    assert ontology.find_term_by_name('char') is char
+    assert ontology.find_definition_by_name('rel') is ontology.hierarchy[0]
+
+
+def test_ontology_find_definitions_after_list_replacements():
+    a: Term = Term(name='a', label='A')
+    ontology: Ontology = Ontology()
+    ontology.add_type(a)
+    assert ontology.find_term_by_name('a') is a
+
+    # Same length, different contents
+    b: Term = Term(name='b', label='B')
+    ontology.types[0] = b
+    assert ontology.find_term_by_name('a') is None
+    assert ontology.find_term_by_name('b') is b
+
+    # Same length, different list
+    c: Term = Term(name='c', label='C')
+    ontology.types = [c]
+    assert ontology.find_term_by_name('b') is None
+    assert ontology.find_term_by_name('c') is c
+
+    d: Term = Term(name='d', label='D')
+    ontology.add_type(d)
+    ontology.types.reverse()
+    ontology.types.pop()
+    assert ontology.find_term_by_name('c') is None
+    assert ontology.find_term_by_name('d') is d
+
+
+def test_nodes_are_slotted_and_share_empty_attributes():
+    string: Term = Term(name='string', label='String')
+    char: Term = Term(name='char', label='Char')
+    rel: Relationship = Relationship(
+        parent=string, relationship=RelationshipType.COMPOSITION, children=[char]
+    )
+
+    assert string.attributes is char.attributes
+    assert rel.attributes is Relationship(string, rel.relationship, []).attributes
+    for node in (string, string.attributes, rel, rel.attributes, Meta()):
+        assert not hasattr(node, '__dict__')
+
+    with pytest.raises(FrozenInstanceError):
+        string.attributes.color = '#red'
+    assert Term(name='char', label='Char').attributes.color is None
@@ -1,4 +1,12 @@
+import glob
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from ontol import (
+    constants,
     Parser,
     Term,
     Function,
@@ -6,14 +14,18 @@ from ontol import (
     TermAttributes,
     FunctionAttributes,
     RelationshipAttributes,
+    JSONSerializer,
 )
+from ontol.diagnostics import Diagnostic, SourceLines
+from ontol.interning import Interner
+from ontol.parser import Lexer, RegexLexer
 
 import pytest
 
 
-@pytest.fixture
-def parser():
-    return Parser()
+@pytest.fixture(params=['lalr', 'descent'])
+def parser(request):
+    return Parser(engine=request.param)
 
 
 def test_parse_empty_file(parser):
@@ -449,7 +461,7 @@ def test_parse_with_empty_labels(parser):
     assert func.input_types[1].label == ''
     assert func.output_type.term.name == 'set'
     assert func.output_type.label == ''
-    print('\n\n'.join(warnings))
+    print('\n\n'.join(map(str, warnings)))
     assert len(warnings) == 6
 
 
@@ -611,3 +623,254 @@ def test_combined_parsing(parser):
     assert ontology.meta is not None
 
     assert len(warnings) == 0
+
+
+def test_parse_warning_points_to_token(parser):
+    content = """types:
+set: 'Set', ''
+element: '', 'Element'
+"""
+    ontology, warnings = parser.parse(content, 'test.ontol')
+
+    assert len(warnings) == 2
+    assert str(warnings[0]) == (
+        'File "test.ontol", line 2\n'
+        "    set: 'Set', ''\n"
+        '                ^\n'
+        f'{constants.warning_prefix} term description is empty'
+    )
+    assert str(warnings[1]) == (
+        'File "test.ontol", line 3\n'
+        "    element: '', 'Element'\n"
+        '             ^\n'
+        f'{constants.warning_prefix} term label is empty'
+    )
+
+
+def test_diagnostic_is_rendered_from_several_threads():
+    entered, release = threading.Event(), threading.Event()
+
+    class BlockingSourceLines(SourceLines):
+        def line(self, line_number):
+            # The first render waits until another one has finished
+            if not entered.is_set():
+                entered.set()
+                release.wait(timeout=5)
+            return super().line(line_number)
+
+    source = BlockingSourceLines("types:\nset: 'Set', ''\n")
+    diagnostic = Diagnostic('test.ontol', source, 2, 19, 'Term description is empty')
+    expected = (
+        'File "test.ontol", line 2\n'
+        "    set: 'Set', ''\n"
+        '                ^\n'
+        f'{constants.warning_prefix} term description is empty'
+    )
+
+    with ThreadPoolExecutor(1) as executor:
+        future = executor.submit(str, diagnostic)
+        assert entered.wait(timeout=5)
+        assert str(diagnostic) == expected
+        release.set()
+        assert future.result() == expected
+    assert diagnostic.source is None
+
+
+def test_parser_tables_are_cached(tmp_path):
+    env = {**os.environ, 'ONTOL_CACHE_DIR': str(tmp_path)}
+    script = "from ontol import Parser; print(len(Parser().parse('types:\\nset: \\'\\', \\'\\'', 'test.ontol')[0].types))"
+
+    first_run = subprocess.run(
+        [sys.executable, '-c', script], env=env, capture_output=True, text=True
+    )
+    assert first_run.stdout.strip() == '1'
+    tables = list(tmp_path.glob('parsetab-*.pickle'))
+    assert len(tables) == 1
+
+    modified_at = tables[0].stat().st_mtime_ns
+    second_run = subprocess.run(
+        [sys.executable, '-c', script], env=env, capture_output=True, text=True
+    )
+    assert second_run.stdout.strip() == '1'
+    assert second_run.stderr == ''
+    assert tables[0].stat().st_mtime_ns == modified_at
+
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'examples')
+
+
+def _token_stream(lexer, content: str) -> list[tuple]:
+    stream: list[tuple] = []
+    try:
+        for token in lexer.tokenize(content):
+            stream.append(
+                (token.type, token.value, token.lineno, token.index, token.end)
+            )
+    except SyntaxError as error:
+        stream.append(('error', str(error)))
+    return stream
+
+
+@pytest.mark.parametrize(
+    'content',
+    [
+        *(
+            open(file_path, encoding='utf-8').read()
+            for file_path in sorted(
+                glob.glob(os.path.join(EXAMPLES_DIR, '**', '*.ontol'), recursive=True)
+            )
+        ),
+        "types_: 'a', 'b'\ntypes9 from_ as\tfigure\n\n\nimport*",
+        "types:\nset: 'a', 'b' $",
+        'types:\ntypesя',
+        'label: \'multi\nline\' # comment\n  -> ( ) { } , "double"\n',
+    ],
+)
+def test_regex_lexer_matches_lexer(content):
+    assert _token_stream(RegexLexer(), content) == _token_stream(Lexer(), content)
+
+
+@pytest.mark.parametrize(
+    'content',
+    [
+        *(
+            open(file_path, encoding='utf-8').read()
+            for file_path in sorted(glob.glob(os.path.join(EXAMPLES_DIR, '*.ontol')))
+        ),
+        "types:\na: '', ''\n# comment\nb: '', ''\n",
+        "types:\na: '', ''\ntitle: 'Title'\n",
+        "types:\na: '', '', {\n, color: '',\n}\nfunctions:\nf: '' (, a: '') -> a: ''\n",
+        "types:\na: '', '', { color: 'x', }\n",
+        "types:\na: '', ''\nfunctions:\nf: '' (\na: '',\n) -> a: '', { type: 'loves' }\n",
+        "types:\na: '', ''\nhierarchy:\nr: a composition a, { direction: '' }\n",
+        "types:\na: '', ''\nfigure 'Figure':\n\na\nb\n",
+        "university: '' )",
+        'import { a as b,\n c } from',
+    ],
+)
+def test_descent_engine_matches_lalr_engine(content):
+    def parse(engine: str) -> tuple:
+        try:
+            ontology, warnings = Parser(engine=engine).parse(content, 'test.ontol')
+        except Exception as error:
+            return (type(error), str(error))
+        return (JSONSerializer.serialize(ontology), list(map(str, warnings)))
+
+    assert parse('descent') == parse('lalr')
+
+
+def test_parser_unexpected_engine():
+    with pytest.raises(ValueError):
+        Parser(engine='earley')
+
+
+def test_parse_with_regex_lexer():
+    file_path = os.path.join(EXAMPLES_DIR, 'bootstrapping', 'bootstrapping.ontol')
+    with open(file_path, encoding='utf-8') as file:
+        content = file.read()
+
+    expected, expected_warnings = Parser().parse(content, file_path)
+    actual, actual_warnings = Parser(RegexLexer).parse(content, file_path)
+
+    assert JSONSerializer.serialize(actual) == JSONSerializer.serialize(expected)
+    assert list(map(str, actual_warnings)) == list(map(str, expected_warnings))
+
+
+@pytest.mark.parametrize('lexer_class', [Lexer, RegexLexer])
+def test_token_values_are_interned(lexer_class):
+    values = [
+        [
+            token.value
+            for token in lexer_class().tokenize(text)
+            if token.type in ('IDENTIFIER', 'STRING')
+        ]
+        for text in (
+            "types:\nset: 'A' , '#D0FFD0'",
+            'types:\n' + "set: 'A', '#D0FF" + "D0'",
+        )
+    ]
+    for first, second in zip(*values):
+        assert first is second
+
+    # Free-form text is not kept in the interpreter's table
+    label = sys.intern(''.join(['A label with ', 'spaces']))
+    (value,) = [
+        token.value
+        for token in lexer_class().tokenize(f"types:\nset: '{label}', ''")
+        if token.type == 'STRING' and token.value
+    ]
+    assert value == label and value is not label
+
+
+def test_attributes_are_shared(tmp_path, parser):
+    (tmp_path / 'base.ontol').write_text(
+        "types:\nset: 'Set', 'A set', {color: '#D0FFD0'}\n", encoding='utf-8'
+    )
+    content = (
+        "import * from 'base.ontol'\n\ntypes:\n"
+        "element: 'Element', 'An element', {color: '#D0FFD0'}\n"
+        "other: 'Other', 'Another term', {color: '#E6B8B7'}\n"
+        "empty: 'Empty', 'No attributes'\n"
+    )
+    ontology, _ = parser.parse(content, str(tmp_path / 'main.ontol'))
+
+    set_term, element, other, empty = ontology.types
+    assert set_term.attributes is element.attributes
+    assert other.attributes is not element.attributes
+    assert empty.attributes is Term('term').attributes
+    assert len(parser.interner) == 2
+    assert parser.interner.hits == 1
+
+
+def test_repeated_parses_do_not_grow_interner(tmp_path):
+    parser = Parser(interner=Interner(max_entries=50))
+    file_path = str(tmp_path / 'main.ontol')
+
+    def parse(version):
+        content = 'types:\n' + ''.join(
+            f"t{index}: 'T', '', {{color: '#{version}{index:04}'}}\n"
+            for index in range(30)
+        )
+        parser.parse(content, file_path)
+
+    parse(10)
+    assert len(parser.interner) == 30
+    parse(10)
+    assert len(parser.interner) == 30
+    assert parser.interner.hits == 30
+
+    for version in range(11, 20):
+        parse(version)
+    assert len(parser.interner) == 50
+
+
+def test_concurrent_parses_share_one_parser(tmp_path, parser):
+    (tmp_path / 'base.ontol').write_text(
+        "version: ''\ntypes:\nset: 'Set', 'A set', {color: '#D0FFD0'}\n",
+        encoding='utf-8',
+    )
+    contents = [
+        "import * from 'base.ontol'\ntypes:\nelement: 'Element', 'An element'\n"
+        'hierarchy:\nset aggregation element\n',
+        "import { set as collection } from 'base.ontol'\n",
+        "title: ''\ntypes:\nelement: 'Element', 'An element', {size: '1'}\n",
+        *(
+            open(file_path, encoding='utf-8').read()
+            for file_path in sorted(glob.glob(os.path.join(EXAMPLES_DIR, '*.ontol')))
+        ),
+    ]
+    file_path = str(tmp_path / 'main.ontol')
+
+    def parse(content: str, shared_parser: Parser) -> tuple:
+        try:
+            ontology, warnings = shared_parser.parse(content, file_path)
+        except Exception as error:
+            return (type(error), str(error))
+        return (JSONSerializer.serialize(ontology), list(map(str, warnings)))
+
+    expected = [parse(content, Parser(engine=parser.engine)) for content in contents]
+    jobs = [index % len(contents) for index in range(300)]
+    with ThreadPoolExecutor(16) as executor:
+        results = list(executor.map(lambda index: parse(contents[index], parser), jobs))
+
+    assert results == [expected[index] for index in jobs]
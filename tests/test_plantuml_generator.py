@@ -1,4 +1,7 @@
+import io
+
 from ontol import (
+    DotGenerator,
     Function,
     Meta,
     Ontology,
@@ -6,6 +9,8 @@ from ontol import (
     Term,
     FunctionArgument,
     PlantUML,
+    RelationshipAttributes,
+    RelationshipDirection,
     RelationshipType,
     TermAttributes,
     FunctionAttributes,
@@ -138,3 +143,91 @@ def test_generate_relationship(generator: PlantUML):
     assert 'aggregation' in result
     assert 'MyTypeChild' in result
     assert 'as' in result
+
+
+def test_write_streams_generated_text(generator: PlantUML, mock_ontology):
+    buffer = io.StringIO()
+    generator.write(mock_ontology, buffer)
+    assert buffer.getvalue() == generator.generate(mock_ontology)
+
+
+def test_generate_dot(mock_ontology):
+    mock_ontology.add_type(
+        Term(
+            name='MyNoted',
+            label='Noted',
+            attributes=TermAttributes(note='First line\\nsecond "line"'),
+        )
+    )
+    dot_output = DotGenerator().generate(mock_ontology)
+    assert dot_output.startswith('digraph ontology {')
+    # Graphviz drops edge labels with splines=ortho
+    assert 'splines=polyline' in dot_output
+    assert 'splines=ortho' not in dot_output
+    assert 'label="TestOntology"' in dot_output
+
+    assert (
+        '"MyTypeParent" [label="test label Term1\\n(A test type1)", '
+        'fillcolor="#E6B8B7"]' in dot_output
+    )
+    assert (
+        '"MyTypeChild" [label="test label Term2\\n(A test type2)", '
+        'fillcolor="white"]' in dot_output
+    )
+    assert (
+        '"note:MyNoted" [shape=note, fillcolor="#FBFB77", '
+        'label="First line\\nsecond \\"line\\""]' in dot_output
+    )
+    assert (
+        '"MyFunction2" [label="test label Func2\\n(MyTypeChild: test2 in1 -> '
+        'MyTypeParent: test_type2)", fillcolor="white"]' in dot_output
+    )
+
+    assert (
+        '"MyTypeChild" -> "MyFunction1" [style=solid, dir=forward, arrowhead=vee, '
+        'arrowtail=vee, color="#E6B8B7", taillabel="2"]' in dot_output
+    )
+    assert (
+        '"MyTypeParent" -> "MyTypeChild" [style=solid, dir=forward, '
+        'arrowhead=diamond, arrowtail=diamond, color="black"]' in dot_output
+    )
+
+    buffer = io.StringIO()
+    DotGenerator().write(mock_ontology, buffer)
+    assert buffer.getvalue() == dot_output
+
+
+@pytest.mark.parametrize('relationship_type', list(RelationshipType))
+@pytest.mark.parametrize(
+    'direction, dot_direction',
+    [
+        (RelationshipDirection.FORWARD, 'forward'),
+        (RelationshipDirection.BACKWARD, 'back'),
+        (RelationshipDirection.BIDIRECTIONAL, 'both'),
+    ],
+)
+def test_generate_dot_arrows(relationship_type, direction, dot_direction):
+    relationship = Relationship(
+        parent=Term('a'),
+        relationship=relationship_type,
+        children=[Term('b')],
+        attributes=RelationshipAttributes(
+            color='#red', title='t', leftChar='1', rightChar='*', direction=direction
+        ),
+    )
+    edge = DotGenerator._generate_edge(relationship)
+    style, shape = {
+        RelationshipType.DEPENDENCE: ('dashed', 'vee'),
+        RelationshipType.ASSOCIATION: ('solid', 'none'),
+        RelationshipType.DIRECT_ASSOCIATION: ('solid', 'vee'),
+        RelationshipType.INHERITANCE: ('solid', 'empty'),
+        RelationshipType.IMPLEMENTATION: ('dashed', 'empty'),
+        RelationshipType.AGGREGATION: ('solid', 'odiamond'),
+        RelationshipType.COMPOSITION: ('solid', 'diamond'),
+    }[relationship_type]
+    if relationship_type == RelationshipType.ASSOCIATION:
+        dot_direction = 'none'
+    assert edge == (
+        f'"a" -> "b" [style={style}, dir={dot_direction}, arrowhead={shape}, '
+        f'arrowtail={shape}, color="red", label="t", taillabel="1", headlabel="*"]'
+    )
@@ -0,0 +1,396 @@
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from ontol import CLI, DotGenerator, PlantUML
+from ontol.renderers import (
+    PNG_END,
+    DotRenderer,
+    HTTPRenderer,
+    LocalRenderer,
+    PipeRenderer,
+    SERVER_URL,
+    decode_plantuml,
+    encode_plantuml,
+    get_renderer,
+)
+
+import pytest
+
+
+STUB_PLANTUML = """
+import sys
+
+args = sys.argv[1:]
+assert args[:2] == ['-tpng', '-pipe'], args
+delimiter = args[3].encode() if args[2:3] == ['-pipedelimitor'] else None
+
+lines, rendered = [], 0
+for line in sys.stdin.buffer:
+    if line.strip() == b'crash':
+        sys.exit(3)
+    lines.append(line)
+    if line.strip() == b'@enduml':
+        sys.stdout.buffer.write(b'PNG' + b''.join(lines).rstrip(b'\\n'))
+        if delimiter is not None:
+            sys.stdout.buffer.write(delimiter + b'\\n')
+        sys.stdout.buffer.flush()
+        lines, rendered = [], rendered + 1
+
+if not rendered:
+    sys.stderr.write('no diagram')
+    sys.exit(1)
+"""
+
+
+@pytest.fixture
+def stub_plantuml(tmp_path):
+    script_path = tmp_path / 'plantuml'
+    script_path.write_text(f'#!{sys.executable}\n{STUB_PLANTUML}', encoding='utf-8')
+    script_path.chmod(0o755)
+    return str(script_path)
+
+
+STUB_DOT = """
+import sys
+
+assert sys.argv[1:] == ['-Tpng'], sys.argv
+graphs = sys.stdin.read().split('digraph')[1:]
+if not graphs:
+    sys.stderr.write('syntax error')
+    sys.exit(1)
+for graph in graphs:
+    sys.stdout.buffer.write(b'PNG' + ('digraph' + graph).strip().encode())
+    sys.stdout.buffer.write(b'IEND\\xaeB`\\x82')
+"""
+
+
+@pytest.fixture
+def stub_dot(tmp_path):
+    script_path = tmp_path / 'dot'
+    script_path.write_text(f'#!{sys.executable}\n{STUB_DOT}', encoding='utf-8')
+    script_path.chmod(0o755)
+    return str(script_path)
+
+
+def test_encode_plantuml():
+    # Example from the PlantUML text encoding documentation
+    assert (
+        encode_plantuml('@startuml\nBob -> Alice : hello\n@enduml')
+        == 'SoWkIImgAStDuNBAJrBGjLDmpCbCJbMmKiX8pSd9vt98pKi1IW80'
+    )
+
+
+def encode_plantuml_by_groups(plantuml_text):
+    # Reference implementation from the PlantUML documentation
+    def encode3bytes(b1, b2, b3):
+        chars = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_'
+        return (
+            chars[b1 >> 2]
+            + chars[((b1 & 0x3) << 4) | (b2 >> 4)]
+            + chars[((b2 & 0xF) << 2) | (b3 >> 6)]
+            + chars[b3 & 0x3F]
+        )
+
+    data = zlib.compress(plantuml_text.encode('utf-8'))[2:-4] + b'\0\0'
+    return ''.join(encode3bytes(*data[i : i + 3]) for i in range(0, len(data) - 2, 3))
+
+
+@pytest.mark.parametrize('size', [0, 1, 2, 3, 10, 1000, 100_000])
+def test_encode_plantuml_round_trip(size):
+    plantuml_text = ''.join(
+        f'rectangle "Тип {i}" as t{i}\n' for i in range(size // 20 + 1)
+    )[:size]
+    encoded = encode_plantuml(plantuml_text)
+    assert encoded == encode_plantuml_by_groups(plantuml_text)
+    assert decode_plantuml(encoded) == plantuml_text
+    assert decode_plantuml(encode_plantuml(plantuml_text, 9)) == plantuml_text
+
+
+def test_get_renderer(monkeypatch):
+    monkeypatch.delenv('ONTOL_RENDERER', raising=False)
+    assert get_renderer().url == SERVER_URL
+    assert get_renderer('http://localhost:8080/png').url == 'http://localhost:8080/png/'
+    assert get_renderer('/opt/plantuml.jar').command == [
+        'java',
+        '-jar',
+        '/opt/plantuml.jar',
+    ]
+    assert get_renderer('plantuml -charset UTF-8').command == [
+        'plantuml',
+        '-charset',
+        'UTF-8',
+    ]
+
+    assert get_renderer('/usr/bin/dot -Gdpi=96').command == [
+        '/usr/bin/dot',
+        '-Gdpi=96',
+    ]
+    assert isinstance(get_renderer('dot'), DotRenderer)
+
+    local_renderer = get_renderer('local:plantuml -charset UTF-8')
+    assert isinstance(local_renderer, LocalRenderer)
+    assert local_renderer.command == ['plantuml', '-charset', 'UTF-8']
+    assert get_renderer('local:/opt/plantuml.jar').command == [
+        'java',
+        '-jar',
+        '/opt/plantuml.jar',
+    ]
+
+    monkeypatch.setenv('ONTOL_RENDERER', 'plantuml')
+    assert isinstance(get_renderer(), PipeRenderer)
+    assert isinstance(get_renderer('http://localhost:8080/png/'), HTTPRenderer)
+
+
+def test_local_renderer(stub_plantuml):
+    renderer = LocalRenderer([stub_plantuml])
+    assert renderer.render('@startuml\n@enduml') == b'PNG@startuml\n@enduml'
+
+    with pytest.raises(ValueError, match='exited with status 1: no diagram'):
+        renderer.render('')
+
+    with pytest.raises(ValueError, match='Could not run PlantUML'):
+        LocalRenderer([stub_plantuml + '.missing']).render('@startuml\n@enduml')
+
+
+def test_local_renderer_renders_batches_in_one_process(stub_plantuml, monkeypatch):
+    runs = []
+    run = subprocess.run
+
+    def counting_run(*args, **kwargs):
+        runs.append(args[0])
+        return run(*args, **kwargs)
+
+    monkeypatch.setattr(subprocess, 'run', counting_run)
+    renderer = LocalRenderer([stub_plantuml])
+    diagrams = [f'@startuml\nA{index} -> B\n@enduml' for index in range(10)]
+
+    assert renderer.render_batch(diagrams) == [
+        b'PNG' + diagram.encode('utf-8') for diagram in diagrams
+    ]
+    assert len(runs) == 1
+
+    with pytest.raises(ValueError, match='rendered 1 images for 2 diagrams'):
+        renderer.render_batch([diagrams[0], 'A -> B'])
+
+
+def test_pipe_renderer_renders_batches_in_order(stub_plantuml):
+    renderer = PipeRenderer([stub_plantuml])
+    diagrams = [f'@startuml\nA{index} -> B\n@enduml' for index in range(50)]
+    try:
+        assert renderer.render_batch(diagrams) == [
+            b'PNG' + diagram.encode('utf-8') for diagram in diagrams
+        ]
+        process = renderer.process
+        assert renderer.render(diagrams[0]) == b'PNG' + diagrams[0].encode('utf-8')
+        assert renderer.process is process
+        assert renderer.check_health()
+    finally:
+        renderer.close()
+    assert renderer.process is None
+
+
+def test_pipe_renderer_restarts_crashed_process(stub_plantuml):
+    renderer = PipeRenderer([stub_plantuml], timeout=0.5)
+    diagram = '@startuml\n@enduml'
+    try:
+        renderer.render(diagram)
+        renderer.process.kill()
+        renderer.process.wait()
+        assert not renderer.check_health()
+        assert renderer.render(diagram) == b'PNG' + diagram.encode('utf-8')
+
+        with pytest.raises(ValueError, match='exited with status 3'):
+            renderer.render('crash\n')
+        with pytest.raises(ValueError, match='did not render the diagram'):
+            renderer.render('@startuml\n')
+        assert renderer.render(diagram) == b'PNG' + diagram.encode('utf-8')
+    finally:
+        renderer.close()
+
+
+def test_cli_renders_with_local_renderer(tmp_path, monkeypatch, stub_plantuml):
+    file_path = tmp_path / 'main.ontol'
+    file_path.write_text("types:\nterm: 'Term', ''\n", encoding='utf-8')
+
+    monkeypatch.setenv('ONTOL_RENDERER', stub_plantuml)
+    monkeypatch.setattr('sys.argv', ['ontol', str(file_path), '--no-cache'])
+    assert CLI().run() == 0
+
+    with open(tmp_path / 'main.png', 'rb') as png_file:
+        png = png_file.read()
+    assert png == b'PNG' + PlantUML().generate(
+        CLI().parser.parse(file_path.read_text(encoding='utf-8'), str(file_path))[0]
+    ).encode('utf-8')
+    assert os.path.exists(tmp_path / 'main.json')
+
+
+def test_dot_renderer_renders_batches_in_one_process(stub_dot, monkeypatch):
+    runs = []
+    run = subprocess.run
+
+    def counting_run(*args, **kwargs):
+        runs.append(args[0])
+        return run(*args, **kwargs)
+
+    monkeypatch.setattr(subprocess, 'run', counting_run)
+    renderer = DotRenderer([stub_dot])
+    graphs = [f'digraph ontology {{\n"a{index}" -> "b"\n}}' for index in range(10)]
+
+    assert renderer.render(graphs[0]) == b'PNG' + graphs[0].encode('utf-8') + PNG_END
+    assert renderer.render_batch(graphs) == [
+        b'PNG' + graph.encode('utf-8') + PNG_END for graph in graphs
+    ]
+    assert len(runs) == 2
+
+    with pytest.raises(ValueError, match='exited with status 1: syntax error'):
+        renderer.render('')
+    with pytest.raises(ValueError, match='Could not run Graphviz'):
+        DotRenderer([stub_dot + '.missing']).render(graphs[0])
+
+
+def test_cli_renders_with_dot(tmp_path, monkeypatch, stub_dot):
+    file_path = tmp_path / 'main.ontol'
+    file_path.write_text("types:\nterm: 'Term', ''\n", encoding='utf-8')
+
+    monkeypatch.setattr(
+        'sys.argv',
+        ['ontol', str(file_path), '--no-cache', '--renderer', stub_dot],
+    )
+    assert CLI().run() == 0
+
+    ontology = CLI().parser.parse(
+        file_path.read_text(encoding='utf-8'), str(file_path)
+    )[0]
+    with open(tmp_path / 'main.png', 'rb') as png_file:
+        assert png_file.read() == (
+            b'PNG' + DotGenerator().generate(ontology).encode('utf-8') + PNG_END
+        )
+    with open(tmp_path / 'main.puml', encoding='utf-8') as puml_file:
+        assert puml_file.read() == PlantUML().generate(ontology)
+
+
+@pytest.mark.skipif(shutil.which('dot') is None, reason='Graphviz is not installed')
+def test_dot_renders_examples():
+    # The generated DOT is valid for the real dot binary, which renders it
+    # without warnings (such as edge labels it cannot place)
+    examples_dir = os.path.join(os.path.dirname(__file__), '..', 'examples')
+    graphs = []
+    for name in sorted(os.listdir(examples_dir)):
+        if name.endswith('.ontol') and name != 'test_ai.ontol':
+            file_path = os.path.join(examples_dir, name)
+            with open(file_path, encoding='utf-8') as file:
+                ontology = CLI().parser.parse(file.read(), file_path)[0]
+            graphs.append(DotGenerator().generate(ontology))
+
+    images = DotRenderer().render_batch(graphs)
+    assert len(images) == len(graphs)
+    assert all(image.startswith(b'\x89PNG') for image in images)
+
+    for graph in graphs:
+        result = subprocess.run(
+            ['dot', '-Tpng', '-o', os.devnull],
+            input=graph.encode('utf-8'),
+            capture_output=True,
+            check=True,
+        )
+        assert result.stderr.decode('utf-8') == ''
+
+
+@pytest.fixture
+def plantuml_server():
+    # Answers every diagram with its encoded text, after failing the first
+    # server.failures GET requests
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            server = self.server
+            with server.lock:
+                server.requests += 1
+                failed = server.failures > 0
+                server.failures -= failed
+            if failed:
+                self.send_error(503)
+                return
+            if server.barrier is not None:
+                server.barrier.wait()
+
+            body = self.path.rsplit('/', 1)[-1].encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            server = self.server
+            server.posts.append(self.path)
+            length = int(self.headers['Content-Length'])
+            body = encode_plantuml(self.rfile.read(length).decode('utf-8'))
+            body = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.lock = threading.Lock()
+    server.posts = []
+    server.requests = 0
+    server.failures = 0
+    server.barrier = None
+    server.url = f'http://127.0.0.1:{server.server_address[1]}/png/'
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_renderer_renders_batches_concurrently(plantuml_server):
+    diagrams = [f'@startuml\nA{index} -> B\n@enduml' for index in range(20)]
+
+    # Every request waits for the others, so serial rendering would time out
+    plantuml_server.barrier = threading.Barrier(len(diagrams), timeout=5)
+    renderer = HTTPRenderer(plantuml_server.url, max_workers=len(diagrams))
+    try:
+        assert renderer.render_batch(diagrams) == [
+            encode_plantuml(diagram).encode('utf-8') for diagram in diagrams
+        ]
+    finally:
+        renderer.close()
+
+
+def test_http_renderer_retries_failed_requests(plantuml_server):
+    plantuml_server.failures = 2
+    renderer = HTTPRenderer(plantuml_server.url)
+    assert renderer.render('@startuml\n@enduml') == encode_plantuml(
+        '@startuml\n@enduml'
+    ).encode('utf-8')
+    assert plantuml_server.requests == 3
+
+    plantuml_server.failures = 2
+    with pytest.raises(requests.RequestException):
+        HTTPRenderer(plantuml_server.url, retries=1).render('@startuml\n@enduml')
+
+
+def test_http_renderer_posts_large_diagrams(plantuml_server):
+    renderer = HTTPRenderer(plantuml_server.url, max_url_length=200)
+    small = '@startuml\nA -> B\n@enduml'
+    large = '@startuml\n' + ''.join(f'A{i} -> B{i}\n' for i in range(200)) + '@enduml'
+
+    assert renderer.render_batch([small, large]) == [
+        encode_plantuml(small).encode('utf-8'),
+        encode_plantuml(large).encode('utf-8'),
+    ]
+    assert plantuml_server.requests == 1
+    assert plantuml_server.posts == ['/png']